@@ -32,6 +32,26 @@ def create_app(config_name='default'):
     from .api import api_bp
     app.register_blueprint(api_bp, url_prefix='/api')
     
+    # 按配置预加载推理模型
+    from .api.inference import init_inference
+    init_inference(app)
+    
+    # 注册定时批量预测作业（需开启 SCHEDULER_ENABLED）
+    from .api.fleet import init_fleet_forecast
+    init_fleet_forecast(app)
+    
+    # 注册训练、部署、特征工程等任务的后台分发作业
+    from .api.dispatch import init_job_dispatcher
+    init_job_dispatcher(app)
+    
+    # 注册训练与数据集任务的状态同步作业
+    from .api.status_sync import init_status_sync
+    init_status_sync(app)
+    
+    # 以上作业只登记不启动；单独运行后台作业进程: flask --app run scheduler
+    from .services.scheduler import scheduler_command
+    app.cli.add_command(scheduler_command)
+    
     # 添加静态文件路由
     @app.route('/static/<path:filename>')
     def static_files(filename):
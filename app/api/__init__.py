@@ -5,5 +5,5 @@ api_bp = Blueprint('api', __name__)
 from . import (
     auth, user, role, menu, dept, device, alarm, data, 
     drone, feature, model, notification, rule, statistics, 
-    trade, workorder, inference
+    trade, workorder, inference, fleet, dispatch, status_sync
 ) 
\ No newline at end of file
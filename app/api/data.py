@@ -114,7 +114,9 @@ def get_prediction_tasks():
             'modelVersion': task.model_version,
             'target': task.target,
             'scenario': task.scenario,
-            'status': task.status
+            'status': task.status,
+            'progress': (task.parameters or {}).get('progress'),
+            'errorMessage': (task.parameters or {}).get('error')
         } for task in tasks]
     })
 
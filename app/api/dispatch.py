@@ -0,0 +1,356 @@
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import jsonify, current_app
+from flask_jwt_extended import jwt_required
+from sqlalchemy import select, update, insert, func, or_, and_
+from sqlalchemy.exc import IntegrityError
+from . import api_bp
+from .. import db
+from ..models import ModelTraining, ModelDeployment, DataPreprocessing, FeatureEngineering, Dataset, JobHeartbeat
+from ..services.model_service import ModelServiceError
+from ..services.scheduler import schedule_job, run_now, running
+
+# 提交到模型服务的后台任务。接口只写入 status='pending' 的记录并立即返回，由调度器中的分发作业
+# 抢占待提交记录（置为 dispatching 并记录 claimed_at）后调用模型服务；提交成功后记录才进入各自的执行中
+# 状态，可重试的失败退回 pending 并按指数退避重试，超过重试次数或不可重试（4xx）时置为 failed。
+# 重试次数与下次提交时间保存在记录上（dispatch_attempts / next_dispatch_at），进程重启后依然有效；
+# 分发进程在提交途中退出时，超过租约（JOB_DISPATCH_LEASE_SECONDS）的 dispatching 记录会被重新抢占。
+# 重新抢占可能重复提交已被模型服务接收的任务，请求体中的任务主键供模型服务去重。
+# 分发作业只在运行调度器的进程中执行（见 services/scheduler.py），每轮结束后在 job_heartbeats 中
+# 记录运行时间；最近没有分发进程运行时，提交接口与 /model/jobs/status 会给出提示。
+JOB_KINDS = {
+    'train': {
+        'model': ModelTraining,
+        'key': 'training_id',
+        'path': '/train',
+        'running': 'running',
+        'payload': lambda row: {
+            'trainingId': row.training_id,
+            'modelType': row.model_type,
+            'datasetConfig': row.dataset_config,
+            'trainingParams': row.training_params
+        }
+    },
+    'deploy': {
+        'model': ModelDeployment,
+        'key': 'deployment_id',
+        'path': '/deploy',
+        'running': 'deploying',
+        'payload': lambda row: {
+            'deploymentId': row.deployment_id,
+            'versionId': row.version_id,
+            'environment': row.environment,
+            'config': row.config
+        }
+    },
+    'preprocess': {
+        'model': DataPreprocessing,
+        'key': 'preprocessing_id',
+        'path': '/preprocess',
+        'running': 'running',
+        'payload': lambda row: {
+            'preprocessingId': row.preprocessing_id,
+            'datasetId': row.dataset_id,
+            'config': row.config
+        }
+    },
+    'feature-engineering': {
+        'model': FeatureEngineering,
+        'key': 'engineering_id',
+        'path': '/feature-engineering',
+        'running': 'running',
+        'payload': lambda row: {
+            'engineeringId': row.engineering_id,
+            'datasetId': row.dataset_id,
+            'config': row.config
+        }
+    },
+    'dataset': {
+        'model': Dataset,
+        'key': 'dataset_id',
+        'path': '/dataset',
+        'running': 'processing',
+        'payload': lambda row: {
+            'datasetId': row.dataset_id,
+            'sourceType': row.source_type,
+            'sourceConfig': row.source_config,
+            'featureConfig': row.feature_config
+        }
+    }
+}
+
+# 同一进程内分发不重叠执行；执行期间收到的唤醒在本轮结束后补跑一轮
+_dispatch_lock = threading.Lock()
+_rerun = threading.Event()
+_last_run = None
+
+def init_job_dispatcher(app):
+    """按配置注册任务分发作业；抢占为条件更新，多个 worker 同时分发也不会重复提交"""
+    registered = schedule_job(
+        app, 'job_dispatch', dispatch_pending_jobs,
+        app.config.get('JOB_DISPATCH_INTERVAL_SECONDS', 5),
+        enabled=app.config.get('JOB_DISPATCH_ENABLED', True)
+    )
+    if registered:
+        # 启动调度器的进程由启动方式决定（gunicorn.conf.py、run.py 或 flask scheduler），创建应用时无法得知；
+        # 超过一个心跳期限后检查本进程与数据库中的心跳，仍没有分发进程运行时记录警告
+        timer = threading.Timer(_stale_after(app.config), _warn_if_no_dispatcher, args=(app,))
+        timer.daemon = True
+        timer.start()
+
+def _stale_after(config):
+    """超过该秒数没有分发记录视为没有分发进程在运行"""
+    return max(3 * config.get('JOB_DISPATCH_INTERVAL_SECONDS', 5), 30)
+
+def _warn_if_no_dispatcher(app):
+    with app.app_context():
+        if running():
+            return
+        health = dispatcher_health()
+        if health['active'] is False:
+            app.logger.warning(
+                '任务分发已开启（JOB_DISPATCH_ENABLED），但本进程未运行调度器，且最近 %d 秒内没有其他分发进程运行，'
+                '新任务将保持 pending。请使用 gunicorn -c gunicorn.conf.py 启动，或另行运行 flask --app run scheduler',
+                health['staleAfterSeconds']
+            )
+
+def _record_heartbeat(now):
+    """记录本进程完成一轮分发的时间"""
+    values = {'last_run_at': now, 'worker': f'{socket.gethostname()}:{os.getpid()}'}
+    result = db.session.execute(update(JobHeartbeat).where(JobHeartbeat.job_id == 'job_dispatch').values(**values))
+    if result.rowcount == 0:
+        try:
+            db.session.execute(insert(JobHeartbeat).values(job_id='job_dispatch', **values))
+        except IntegrityError:
+            # 其他进程同时写入了首条心跳
+            db.session.rollback()
+            return
+    db.session.commit()
+
+def dispatcher_health():
+    """最近一次分发时间与是否有分发进程在运行；心跳表不可用时 active 为 None"""
+    stale_after = _stale_after(current_app.config)
+    try:
+        heartbeat = db.session.get(JobHeartbeat, 'job_dispatch')
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.warning(f'读取任务分发心跳失败: {str(e)}')
+        return {'enabled': current_app.config.get('JOB_DISPATCH_ENABLED', True), 'active': None,
+                'lastRunAt': None, 'worker': None, 'staleAfterSeconds': stale_after}
+
+    last_run_at = heartbeat.last_run_at if heartbeat else None
+    return {
+        'enabled': current_app.config.get('JOB_DISPATCH_ENABLED', True),
+        'active': last_run_at is not None and datetime.now() - last_run_at <= timedelta(seconds=stale_after),
+        'lastRunAt': last_run_at.strftime('%Y-%m-%d %H:%M:%S') if last_run_at else None,
+        'worker': heartbeat.worker if heartbeat else None,
+        'staleAfterSeconds': stale_after
+    }
+
+def notify_dispatcher():
+    """新任务写入后唤醒分发作业，返回附加到提交接口响应中的字段；最近没有分发进程运行时包含 warning"""
+    if wake_dispatcher():
+        return {}
+    health = dispatcher_health()
+    if not health['enabled']:
+        return {'warning': '任务分发未开启（JOB_DISPATCH_ENABLED=false），任务将保持待提交状态'}
+    if health['active'] is False:
+        return {'warning': f'最近 {health["staleAfterSeconds"]} 秒内没有任务分发进程运行，任务将保持待提交状态，'
+                           f'请检查后台作业进程（flask --app run scheduler）'}
+    return {}
+
+def wake_dispatcher():
+    """新任务写入后立即触发一次分发；本进程未注册分发作业时返回 False，由其他进程的分发作业提交"""
+    if _dispatch_lock.locked():
+        _rerun.set()
+        return True
+    return run_now('job_dispatch')
+
+def _submit(client, kind, payload):
+    """提交一个任务，返回 (错误信息, 是否可重试)"""
+    try:
+        response = client.post(kind, JOB_KINDS[kind]['path'], json=payload)
+    except ModelServiceError as e:
+        return str(e), True
+
+    if response.status_code == 200:
+        return None, False
+    return f'模型服务返回错误: {response.text}', response.status_code >= 500 or response.status_code == 429
+
+def _claimable(model, now, lease):
+    """可抢占的记录：到达下次提交时间的 pending 记录，以及租约已过期的 dispatching 记录"""
+    return or_(
+        and_(model.status == 'pending',
+             or_(model.next_dispatch_at.is_(None), model.next_dispatch_at <= now)),
+        and_(model.status == 'dispatching',
+             or_(model.claimed_at.is_(None), model.claimed_at <= now - timedelta(seconds=lease)))
+    )
+
+def _claim(batch_size, lease):
+    """抢占各类待提交记录，返回 ([(类型, 主键)], 抢占时间)
+
+    抢占时间精确到秒（MySQL DATETIME 默认不保存微秒），提交后以其判断记录是否仍由本轮抢占。
+    """
+    now = datetime.now().replace(microsecond=0)
+    claimed = []
+    for kind, spec in JOB_KINDS.items():
+        model = spec['model']
+        key = getattr(model, spec['key'])
+        job_ids = db.session.execute(
+            select(key).where(_claimable(model, now, lease)).order_by(key).limit(batch_size)
+        ).scalars().all()
+
+        for job_id in job_ids:
+            # 条件更新：更新时重新判断是否可抢占，多个进程同时抢占时每条记录只会被一个进程提交
+            result = db.session.execute(
+                update(model)
+                .where(key == job_id, _claimable(model, now, lease))
+                .values(status='dispatching', claimed_at=now, updated_at=now)
+            )
+            if result.rowcount == 1:
+                claimed.append((kind, job_id))
+    db.session.commit()
+    return claimed, now
+
+def _dispatch_once():
+    config = current_app.config
+    batch_size = config.get('JOB_DISPATCH_BATCH_SIZE', 50)
+    max_attempts = config.get('JOB_DISPATCH_MAX_ATTEMPTS', 5)
+    backoff = config.get('JOB_DISPATCH_BACKOFF_SECONDS', 10)
+    max_backoff = config.get('JOB_DISPATCH_MAX_BACKOFF_SECONDS', 300)
+    lease = config.get('JOB_DISPATCH_LEASE_SECONDS', 300)
+
+    stats = {'claimed': 0, 'submitted': 0, 'retrying': 0, 'failed': 0, 'lost': 0}
+    claimed, claimed_at = _claim(batch_size, lease)
+    if not claimed:
+        return stats
+    stats['claimed'] = len(claimed)
+
+    rows = [db.session.get(JOB_KINDS[kind]['model'], job_id) for kind, job_id in claimed]
+    payloads = [JOB_KINDS[kind]['payload'](row) for (kind, _), row in zip(claimed, rows)]
+    attempts = [row.dispatch_attempts or 0 for row in rows]
+    # 远程调用期间不持有事务
+    db.session.commit()
+
+    # 远程调用并发执行（并发上限由模型服务客户端的信号量控制），数据库更新在本线程中统一提交
+    from .model import get_model_service
+    client = get_model_service()
+    with ThreadPoolExecutor(max_workers=min(len(claimed), client.max_concurrency)) as executor:
+        outcomes = list(executor.map(
+            lambda item: _submit(client, item[0][0], item[1]),
+            zip(claimed, payloads)
+        ))
+
+    now = datetime.now()
+    for (kind, job_id), previous, (error, retryable) in zip(claimed, attempts, outcomes):
+        spec = JOB_KINDS[kind]
+        model = spec['model']
+        if error is None:
+            values = {'status': spec['running'], 'dispatch_attempts': 0, 'next_dispatch_at': None}
+            if previous:
+                values['error_message'] = None
+            outcome = 'submitted'
+        elif retryable and previous + 1 < max_attempts:
+            values = {
+                'status': 'pending',
+                'dispatch_attempts': previous + 1,
+                'next_dispatch_at': now + timedelta(seconds=min(backoff * 2 ** previous, max_backoff)),
+                'error_message': error
+            }
+            outcome = 'retrying'
+        else:
+            values = {'status': 'failed', 'dispatch_attempts': previous + 1, 'error_message': error}
+            outcome = 'failed'
+
+        # 只更新仍由本轮抢占的记录；提交超过租约被其他进程重新抢占的记录交由对方处理
+        key = getattr(model, spec['key'])
+        result = db.session.execute(
+            update(model)
+            .where(key == job_id, model.status == 'dispatching', model.claimed_at == claimed_at)
+            .values(claimed_at=None, updated_at=now, **values)
+        )
+        stats[outcome if result.rowcount == 1 else 'lost'] += 1
+    db.session.commit()
+    return stats
+
+def dispatch_pending_jobs():
+    """分发一轮待提交任务，返回统计；已有分发进行中时返回 None（本轮结束后会补跑）"""
+    global _last_run
+    if not _dispatch_lock.acquire(blocking=False):
+        _rerun.set()
+        return None
+
+    try:
+        started = time.perf_counter()
+        totals = {'claimed': 0, 'submitted': 0, 'retrying': 0, 'failed': 0, 'lost': 0, 'rounds': 0}
+        while True:
+            _rerun.clear()
+            stats = _dispatch_once()
+            totals['rounds'] += 1
+            for name, value in stats.items():
+                totals[name] += value
+            if not _rerun.is_set():
+                break
+
+        finished_at = datetime.now()
+        _record_heartbeat(finished_at)
+        totals['seconds'] = round(time.perf_counter() - started, 3)
+        totals['finished_at'] = finished_at.strftime('%Y-%m-%d %H:%M:%S')
+        if totals['claimed']:
+            current_app.logger.info(
+                '任务分发：提交 %d，重试 %d，失败 %d', totals['submitted'], totals['retrying'], totals['failed']
+            )
+        _last_run = totals
+        return totals
+
+    except Exception as e:
+        db.session.rollback()
+        _last_run = {'error': str(e), 'finished_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+        current_app.logger.error(f'任务分发失败: {str(e)}')
+        raise
+    finally:
+        _dispatch_lock.release()
+
+def dispatch_stats():
+    """各类任务按状态的数量、等待重试的记录、本进程最近一次分发统计与分发进程的心跳"""
+    now = datetime.now()
+    counts = {}
+    retrying = []
+    for kind, spec in JOB_KINDS.items():
+        model = spec['model']
+        counts[kind] = dict(db.session.execute(
+            select(model.status, func.count()).group_by(model.status)
+        ).all())
+        rows = db.session.execute(
+            select(model).where(model.status == 'pending', model.dispatch_attempts > 0)
+            .order_by(model.next_dispatch_at).limit(100)
+        ).scalars().all()
+        retrying.extend({
+            'type': kind,
+            'id': getattr(row, spec['key']),
+            'attempts': row.dispatch_attempts,
+            'next_in_seconds': round(max(0.0, (row.next_dispatch_at - now).total_seconds()), 1)
+            if row.next_dispatch_at else 0.0,
+            'error': row.error_message
+        } for row in rows)
+
+    return {
+        'counts': counts,
+        'retrying': retrying,
+        'last_run': _last_run,
+        'running': _dispatch_lock.locked(),
+        'dispatcher': dispatcher_health()
+    }
+
+@api_bp.route('/model/jobs/status', methods=['GET'])
+@jwt_required()
+def get_job_dispatch_status():
+    """获取训练、部署、预处理、特征工程与数据集任务的分发状态"""
+    try:
+        return jsonify({'code': 200, 'msg': '查询成功', 'data': dispatch_stats()})
+    except Exception as e:
+        return jsonify({'code': 500, 'msg': f'获取任务分发状态失败: {str(e)}'}), 500
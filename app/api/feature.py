@@ -1,15 +1,11 @@
 from flask import request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from . import api_bp
-# from ..models import FeatureEngineering, DataPreprocessing, Dataset
+from ..models import FeatureEngineering, DataPreprocessing, Dataset
 from .. import db
-from datetime import datetime
-import pandas as pd
-import numpy as np
-import requests
-
-# 模型服务配置
-MODEL_SERVICE_URL = "http://model-service:8000"  # 时序预测大模型服务的地址
+from .model import get_model_service
+from .dispatch import notify_dispatcher
+from .status_sync import freshness
 
 @api_bp.route('/feature/preprocess', methods=['POST'])
 @jwt_required()
@@ -32,43 +28,22 @@ def preprocess_data():
     
     try:
         db.session.commit()
-        
-        # 调用数据预处理服务
-        try:
-            response = requests.post(
-                f"{MODEL_SERVICE_URL}/preprocess",
-                json={
-                    'preprocessingId': preprocessing.preprocessing_id,
-                    'datasetId': preprocessing.dataset_id,
-                    'config': preprocessing.config
-                }
-            )
-            
-            if response.status_code == 200:
-                return jsonify({
-                    'code': 200,
-                    'msg': '预处理任务已提交',
-                    'preprocessingId': preprocessing.preprocessing_id
-                })
-            else:
-                raise Exception(f"预处理服务返回错误: {response.text}")
-                
-        except Exception as e:
-            preprocessing.status = 'failed'
-            preprocessing.error_message = str(e)
-            db.session.commit()
-            
-            return jsonify({
-                'code': 500,
-                'msg': f'提交预处理任务失败: {str(e)}'
-            }), 500
-            
     except Exception as e:
         db.session.rollback()
         return jsonify({
             'code': 500,
             'msg': f'创建预处理记录失败: {str(e)}'
         }), 500
+    
+    # 由后台分发作业提交预处理任务
+    notice = notify_dispatcher()
+    
+    return jsonify({
+        'code': 200,
+        'msg': '预处理任务已提交',
+        'preprocessingId': preprocessing.preprocessing_id,
+        **notice
+    })
 
 @api_bp.route('/feature/engineer', methods=['POST'])
 @jwt_required()
@@ -91,43 +66,22 @@ def engineer_features():
     
     try:
         db.session.commit()
-        
-        # 调用特征工程服务
-        try:
-            response = requests.post(
-                f"{MODEL_SERVICE_URL}/feature-engineering",
-                json={
-                    'engineeringId': feature_engineering.engineering_id,
-                    'datasetId': feature_engineering.dataset_id,
-                    'config': feature_engineering.config
-                }
-            )
-            
-            if response.status_code == 200:
-                return jsonify({
-                    'code': 200,
-                    'msg': '特征工程任务已提交',
-                    'engineeringId': feature_engineering.engineering_id
-                })
-            else:
-                raise Exception(f"特征工程服务返回错误: {response.text}")
-                
-        except Exception as e:
-            feature_engineering.status = 'failed'
-            feature_engineering.error_message = str(e)
-            db.session.commit()
-            
-            return jsonify({
-                'code': 500,
-                'msg': f'提交特征工程任务失败: {str(e)}'
-            }), 500
-            
     except Exception as e:
         db.session.rollback()
         return jsonify({
             'code': 500,
             'msg': f'创建特征工程记录失败: {str(e)}'
         }), 500
+    
+    # 由后台分发作业提交特征工程任务
+    notice = notify_dispatcher()
+    
+    return jsonify({
+        'code': 200,
+        'msg': '特征工程任务已提交',
+        'engineeringId': feature_engineering.engineering_id,
+        **notice
+    })
 
 @api_bp.route('/feature/dataset', methods=['POST'])
 @jwt_required()
@@ -148,44 +102,22 @@ def create_dataset():
     
     try:
         db.session.commit()
-        
-        # 调用数据集创建服务
-        try:
-            response = requests.post(
-                f"{MODEL_SERVICE_URL}/dataset",
-                json={
-                    'datasetId': dataset.dataset_id,
-                    'sourceType': dataset.source_type,
-                    'sourceConfig': dataset.source_config,
-                    'featureConfig': dataset.feature_config
-                }
-            )
-            
-            if response.status_code == 200:
-                return jsonify({
-                    'code': 200,
-                    'msg': '数据集创建任务已提交',
-                    'datasetId': dataset.dataset_id
-                })
-            else:
-                raise Exception(f"数据集服务返回错误: {response.text}")
-                
-        except Exception as e:
-            dataset.status = 'failed'
-            dataset.error_message = str(e)
-            db.session.commit()
-            
-            return jsonify({
-                'code': 500,
-                'msg': f'提交数据集创建任务失败: {str(e)}'
-            }), 500
-            
     except Exception as e:
         db.session.rollback()
         return jsonify({
             'code': 500,
             'msg': f'创建数据集记录失败: {str(e)}'
         }), 500
+    
+    # 由后台分发作业提交数据集创建任务
+    notice = notify_dispatcher()
+    
+    return jsonify({
+        'code': 200,
+        'msg': '数据集创建任务已提交',
+        'datasetId': dataset.dataset_id,
+        **notice
+    })
 
 @api_bp.route('/feature/dataset/<int:dataset_id>', methods=['GET'])
 @jwt_required()
@@ -198,46 +130,25 @@ def get_dataset_info(dataset_id):
             'msg': '数据集不存在'
         }), 404
     
-    try:
-        # 从数据集服务获取最新状态
-        response = requests.get(f"{MODEL_SERVICE_URL}/dataset/{dataset_id}/info")
-        
-        if response.status_code == 200:
-            info_data = response.json()
-            
-            # 更新数据集信息
-            dataset.status = info_data.get('status', dataset.status)
-            dataset.statistics = info_data.get('statistics', dataset.statistics)
-            dataset.schema = info_data.get('schema', dataset.schema)
-            dataset.error_message = info_data.get('errorMessage', dataset.error_message)
-            
-            db.session.commit()
-            
-            return jsonify({
-                'code': 200,
-                'msg': '查询成功',
-                'data': {
-                    'datasetId': dataset.dataset_id,
-                    'name': dataset.name,
-                    'description': dataset.description,
-                    'sourceType': dataset.source_type,
-                    'status': dataset.status,
-                    'statistics': dataset.statistics,
-                    'schema': dataset.schema,
-                    'errorMessage': dataset.error_message,
-                    'createdBy': dataset.created_by,
-                    'createdAt': dataset.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                    'updatedAt': dataset.updated_at.strftime('%Y-%m-%d %H:%M:%S') if dataset.updated_at else None
-                }
-            })
-        else:
-            raise Exception(f"数据集服务返回错误: {response.text}")
-            
-    except Exception as e:
-        return jsonify({
-            'code': 500,
-            'msg': f'获取数据集信息失败: {str(e)}'
-        }), 500
+    # 状态由后台同步作业从数据集服务批量刷新，这里直接返回库中记录
+    return jsonify({
+        'code': 200,
+        'msg': '查询成功',
+        'data': {
+            'datasetId': dataset.dataset_id,
+            'name': dataset.name,
+            'description': dataset.description,
+            'sourceType': dataset.source_type,
+            'status': dataset.status,
+            'statistics': dataset.statistics,
+            'schema': dataset.schema,
+            'errorMessage': dataset.error_message,
+            'createdBy': dataset.created_by,
+            'createdAt': dataset.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'updatedAt': dataset.updated_at.strftime('%Y-%m-%d %H:%M:%S') if dataset.updated_at else None,
+            **freshness('dataset', dataset)
+        }
+    })
 
 @api_bp.route('/feature/dataset/<int:dataset_id>/preview', methods=['GET'])
 @jwt_required()
@@ -254,8 +165,8 @@ def preview_dataset(dataset_id):
     
     try:
         # 从数据集服务获取预览数据
-        response = requests.get(
-            f"{MODEL_SERVICE_URL}/dataset/{dataset_id}/preview",
+        response = get_model_service().get(
+            'dataset-preview', f'/dataset/{dataset_id}/preview',
             params={'limit': limit}
         )
         
@@ -0,0 +1,260 @@
+import math
+import threading
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from flask import jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import select, func, insert, update
+from sqlalchemy.exc import IntegrityError
+from . import api_bp
+from .. import db
+from ..models import RealtimeData, PredictionTask, PredictionResult, FleetForecastRun
+from ..services.scheduler import schedule_job, jobs
+from .inference import load_model, _generate_batch, model_identity, _model_unavailable_message
+
+# 同一进程内批量预测不重叠执行；记录最近一次运行的统计
+_run_lock = threading.Lock()
+_last_run = None
+
+def init_fleet_forecast(app):
+    """按配置注册定时批量预测作业"""
+    interval = app.config.get('INFERENCE_FLEET_INTERVAL_MINUTES', 0)
+    schedule_job(app, 'fleet_forecast', run_fleet_forecast, interval * 60, scheduled=True)
+
+def _claim_slot(interval_minutes):
+    """抢占当前调度时段，返回时段起点；该时段已被其他进程执行时返回 None
+
+    时段按间隔对齐到整点（取最近的时段起点），各进程的触发时刻略有偏差时仍落在同一时段；
+    时段表以起点为主键，并发插入时只有一个进程成功。
+    """
+    seconds = interval_minutes * 60
+    slot_start = datetime.fromtimestamp(math.floor(time.time() / seconds + 0.5) * seconds)
+    db.session.add(FleetForecastRun(slot_start=slot_start, status='running', started_at=datetime.now()))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return None
+    return slot_start
+
+def _finish_slot(slot_start, status, stats):
+    db.session.execute(
+        update(FleetForecastRun)
+        .where(FleetForecastRun.slot_start == slot_start)
+        .values(status=status, finished_at=datetime.now(), stats=stats)
+    )
+    db.session.commit()
+
+def _latest_windows(lookback):
+    """用一次窗口函数查询取出每台设备最近 lookback 条功率数据，按设备切分为 {device_id: (timestamps, values)}"""
+    row_number = func.row_number().over(
+        partition_by=RealtimeData.device_id,
+        order_by=RealtimeData.timestamp.desc()
+    ).label('row_number')
+    latest = select(
+        RealtimeData.device_id, RealtimeData.timestamp, RealtimeData.power_output, row_number
+    ).where(
+        RealtimeData.device_id.isnot(None),
+        RealtimeData.power_output.isnot(None)
+    ).subquery()
+
+    rows = db.session.execute(
+        select(latest.c.device_id, latest.c.timestamp, latest.c.power_output)
+        .where(latest.c.row_number <= lookback)
+        .order_by(latest.c.device_id, latest.c.timestamp)
+    ).all()
+    if not rows:
+        return {}
+
+    device_ids, timestamps, values = zip(*rows)
+    device_ids = np.asarray(device_ids)
+    timestamps = np.asarray(timestamps, dtype='datetime64[s]')
+    values = np.asarray(values, dtype=np.float32)
+
+    bounds = np.flatnonzero(np.diff(device_ids)) + 1
+    return {
+        int(ids[0]): (stamps, series)
+        for ids, stamps, series in zip(np.split(device_ids, bounds), np.split(timestamps, bounds), np.split(values, bounds))
+    }
+
+def _forecast_timestamps(timestamps, horizon):
+    """以历史采样间隔的中位数外推预测时间戳"""
+    step = np.median(np.diff(timestamps)) if len(timestamps) > 1 else np.timedelta64(1, 'h')
+    if step <= np.timedelta64(0, 's'):
+        step = np.timedelta64(1, 'h')
+    return pd.to_datetime(timestamps[-1] + step * np.arange(1, horizon + 1)).to_pydatetime()
+
+def run_fleet_forecast(created_by=None, scheduled=False):
+    """对全部设备执行一次批量功率预测，返回运行统计；已有运行进行中时返回 None
+
+    scheduled 为 True（定时触发）时先抢占当前调度时段，时段已执行过（其他进程或本进程）则跳过本次。
+    """
+    global _last_run
+    if not _run_lock.acquire(blocking=False):
+        return None
+
+    slot_start = None
+    # 设备 -> 已创建的预测任务主键，运行中途失败时据此把未完成的任务置为失败
+    task_ids = {}
+    try:
+        config = current_app.config
+        if scheduled:
+            slot_start = _claim_slot(config.get('INFERENCE_FLEET_INTERVAL_MINUTES'))
+            if slot_start is None:
+                current_app.logger.info('批量预测：当前调度时段已执行，跳过')
+                return None
+        lookback = config.get('INFERENCE_FLEET_LOOKBACK', 512)
+        horizon = config.get('INFERENCE_FLEET_HORIZON', 96)
+        batch_size = config.get('INFERENCE_FLEET_BATCH_SIZE', 32)
+        num_samples = config.get('INFERENCE_FLEET_NUM_SAMPLES', 20)
+        min_history = config.get('INFERENCE_FLEET_MIN_HISTORY', 64)
+
+        started = time.perf_counter()
+        started_at = datetime.now()
+        stats = {
+            'started_at': started_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'slot': slot_start.strftime('%Y-%m-%d %H:%M:%S') if slot_start else None,
+            'devices': 0,
+            'skipped': 0,
+            'failed': 0,
+            'batches': 0
+        }
+
+        if load_model(timeout=config.get('INFERENCE_MODEL_WAIT_TIMEOUT')) is None:
+            raise RuntimeError(_model_unavailable_message())
+        model_version = model_identity()
+
+        windows = _latest_windows(lookback)
+        eligible = {device_id: window for device_id, window in windows.items() if len(window[1]) >= min_history}
+        stats['skipped'] = len(windows) - len(eligible)
+
+        # 先一次性创建全部设备的预测任务，再逐批推理，结果与任务状态按批批量写入
+        parameters = {'lookback': lookback, 'horizon': horizon, 'num_samples': num_samples, 'progress': 0}
+        tasks = {
+            device_id: PredictionTask(
+                created_by=created_by,
+                task_type='fleet_forecast',
+                start_time=started_at,
+                end_time=started_at,
+                model_version=model_version,
+                parameters=parameters,
+                target=str(device_id),
+                scenario='fleet',
+                status='running'
+            )
+            for device_id in eligible
+        }
+        db.session.add_all(tasks.values())
+        db.session.commit()
+        task_ids.update((device_id, task.task_id) for device_id, task in tasks.items())
+
+        device_ids = list(eligible)
+        for offset in range(0, len(device_ids), batch_size):
+            batch_ids = device_ids[offset:offset + batch_size]
+
+            # 历史不足 lookback 的设备用首值左侧补齐，与微批调度器的补齐方式一致
+            length = max(len(eligible[device_id][1]) for device_id in batch_ids)
+            batch = np.empty((len(batch_ids), length), dtype=np.float32)
+            for row, device_id in enumerate(batch_ids):
+                series = eligible[device_id][1]
+                batch[row, :length - len(series)] = series[0]
+                batch[row, length - len(series):] = series
+
+            try:
+                predictions = _generate_batch(batch, horizon, num_samples=num_samples).mean(axis=1)
+            except Exception as e:
+                _update_tasks(
+                    [task_ids[device_id] for device_id in batch_ids],
+                    status='failed', end_time=datetime.now(), parameters={**parameters, 'error': str(e)}
+                )
+                db.session.commit()
+                stats['failed'] += len(batch_ids)
+                continue
+
+            rows = []
+            for device_id, prediction in zip(batch_ids, predictions.tolist()):
+                timestamps = _forecast_timestamps(eligible[device_id][0], horizon)
+                rows.extend({
+                    'task_id': task_ids[device_id],
+                    'timestamp': timestamp,
+                    'predicted_value': value
+                } for timestamp, value in zip(timestamps, prediction))
+            db.session.execute(insert(PredictionResult), rows)
+            _update_tasks(
+                [task_ids[device_id] for device_id in batch_ids],
+                status='completed', end_time=datetime.now(), parameters={**parameters, 'progress': 100}
+            )
+            db.session.commit()
+
+            stats['devices'] += len(batch_ids)
+            stats['batches'] += 1
+
+        elapsed = time.perf_counter() - started
+        stats['seconds'] = round(elapsed, 3)
+        stats['devices_per_second'] = round(stats['devices'] / elapsed, 2) if elapsed > 0 else None
+        current_app.logger.info(
+            '批量预测完成：%d 台设备，耗时 %.2fs，%.2f 台/秒',
+            stats['devices'], elapsed, stats['devices_per_second'] or 0
+        )
+        if slot_start is not None:
+            _finish_slot(slot_start, 'completed', stats)
+        _last_run = stats
+        return stats
+
+    except Exception as e:
+        db.session.rollback()
+        _last_run = {'error': str(e), 'finished_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+        current_app.logger.error(f'批量预测失败: {str(e)}')
+        if task_ids:
+            # 尚未完成的任务置为失败，避免一直显示为执行中
+            try:
+                _update_tasks(
+                    list(task_ids.values()), only_running=True,
+                    status='failed', end_time=datetime.now(), parameters={**parameters, 'error': str(e)}
+                )
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+        if slot_start is not None:
+            try:
+                _finish_slot(slot_start, 'failed', _last_run)
+            except Exception:
+                db.session.rollback()
+        raise
+    finally:
+        _run_lock.release()
+
+def _update_tasks(task_ids, only_running=False, **values):
+    """按主键批量更新预测任务"""
+    conditions = [PredictionTask.task_id.in_(task_ids)]
+    if only_running:
+        conditions.append(PredictionTask.status == 'running')
+    db.session.execute(update(PredictionTask).where(*conditions).values(**values))
+
+def fleet_stats():
+    return {
+        'last_run': _last_run,
+        'running': _run_lock.locked(),
+        'jobs': jobs()
+    }
+
+@api_bp.route('/prediction/fleet/run', methods=['POST'])
+@jwt_required()
+def run_fleet_prediction():
+    """手动触发一次全部设备的批量功率预测"""
+    try:
+        stats = run_fleet_forecast(created_by=get_jwt_identity())
+    except Exception as e:
+        return jsonify({'code': 500, 'msg': f'批量预测失败: {str(e)}'})
+
+    if stats is None:
+        return jsonify({'code': 409, 'msg': '批量预测正在执行中'})
+    return jsonify({'code': 200, 'msg': '批量预测完成', 'data': stats})
+
+@api_bp.route('/prediction/fleet/status', methods=['GET'])
+@jwt_required()
+def get_fleet_prediction_status():
+    """获取批量预测的最近运行统计与调度状态"""
+    return jsonify({'code': 200, 'msg': '查询成功', 'data': fleet_stats()})
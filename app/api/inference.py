@@ -1,54 +1,425 @@
 import os
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import click
+import requests
 import pandas as pd
 import numpy as np
 import torch
-from flask import request, jsonify
+from flask import request, jsonify, current_app, Response
+from flask.cli import with_appcontext
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from sqlalchemy import insert
 from transformers import AutoModelForCausalLM
 from . import api_bp
+from .. import db
+from ..models import PredictionTask, PredictionResult, ModelVersion
+from ..services.batcher import ForecastBatcher
+from ..services.model_manager import ModelManager
+from ..services.model_registry import ModelRegistry
+from ..services.forecast_cache import ForecastCache
+from ..services.singleflight import SingleFlight
+from ..services.dataset_store import DatasetStore
+from ..services import array_codec, payload
+from ..services.inference_engine import BACKENDS, prepare_model, compare_backends
+from ..services.memory_report import process_memory, workers_memory
+from ..services.resources import ResourceManager
+from ..services.stub_model import StubForecaster
+from ..services import benchmark
+from ..services.streaming import sse_event, decode_in_chunks
+from ..services.forecasting import (
+    finite_or_none, column_values, parse_sampling, sample_quantiles, backtest_segments, error_metrics
+)
 import json
 
-# 全局变量存储模型
-model = None
+# 支持的示例数据集
+SAMPLE_DATASETS = {
+    'ETTh2': 'ETTh2.csv',
+    'Electricity': 'Electricity.csv',
+    'Wind': 'Wind.csv',
+    'ETTh1': 'ETTh1.csv',
+    'ETTm1': 'ETTm1.csv',
+    'ETTm2': 'ETTm2.csv'
+}
 
-def load_model():
-    """加载Predenergy模型"""
-    global model
+# 微批调度器、预测结果缓存、数据集缓存与异步任务线程池（按进程懒加载）
+_batcher = None
+_forecast_cache = None
+_dataset_store = None
+_job_executor = None
+_model_registry = None
+_single_flight = None
+_batcher_lock = threading.Lock()
+
+# 当前进程使用的推理后端（eager/int8/compile），由 init_inference 按配置设置
+inference_backend = 'eager'
+# 使用确定性替身模型时为每个解码步的模拟耗时（毫秒），None 表示加载真实模型
+stub_step_ms = None
+
+def _load_predenergy_checkpoint(checkpoint_path=None):
+    """从本地检查点目录加载自定义模型实现（fp32），默认为项目下的 Predenergy 目录"""
+    if checkpoint_path is None:
+        project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+        checkpoint_path = os.path.join(project_root, 'Predenergy')
+    return AutoModelForCausalLM.from_pretrained(checkpoint_path, trust_remote_code=True)
+
+def _load_predenergy(checkpoint_path=None):
+    """加载模型并按配置的推理后端进行优化"""
+    resource_manager.apply()
+    if stub_step_ms is not None:
+        return StubForecaster(step_ms=stub_step_ms)
+    return prepare_model(_load_predenergy_checkpoint(checkpoint_path), inference_backend)
+
+def _warmup_predenergy(model):
+    """用正弦波哑数据执行一次小规模 generate 完成预热"""
+    dummy = torch.sin(torch.linspace(0, 8 * np.pi, 256)).unsqueeze(0)
+    with torch.no_grad():
+        model.generate(dummy, max_new_tokens=16, num_samples=2)
+
+# 当前 worker 的 CPU 线程预算与核心绑定，在加载模型前应用
+resource_manager = ResourceManager()
+
+# 全局模型生命周期管理
+model_manager = ModelManager(_load_predenergy, warmup=_warmup_predenergy, name='Predenergy')
+
+def init_inference(app):
+    """按配置在应用启动时预加载模型：lazy（首个请求时）/ eager（同步）/ background（后台线程）"""
+    global inference_backend, stub_step_ms
+    inference_backend = app.config.get('INFERENCE_BACKEND', 'eager')
+    if app.config.get('INFERENCE_STUB_MODEL'):
+        stub_step_ms = app.config.get('INFERENCE_STUB_STEP_MS', 0.0)
+    model_manager.warmup_runs = app.config.get('INFERENCE_MODEL_WARMUP_RUNS', 2)
+    model_manager.retry_after = app.config.get('INFERENCE_MODEL_RETRY_SECONDS', 30)
+    resource_manager.configure(
+        workers=app.config.get('INFERENCE_WORKERS', 1),
+        worker_index=int(os.environ.get('INFERENCE_WORKER_INDEX') or 0),
+        threads=app.config.get('INFERENCE_TORCH_THREADS'),
+        interop_threads=app.config.get('INFERENCE_TORCH_INTEROP_THREADS', 1),
+        pin_cores=app.config.get('INFERENCE_CPU_AFFINITY', False)
+    )
+    app.cli.add_command(inference_backends_command)
+    app.cli.add_command(inference_bench_command)
+    
+    mode = app.config.get('INFERENCE_MODEL_PRELOAD', 'lazy')
+    if mode == 'eager':
+        model_manager.start(background=False)
+    elif mode == 'background':
+        model_manager.start(background=True)
+
+@click.command('inference-backends')
+@click.option('--backends', default=','.join(BACKENDS), help='逗号分隔的待比较后端')
+@click.option('--batch-size', default=4, type=int)
+@click.option('--lookback', default=512, type=int)
+@click.option('--horizon', default=96, type=int)
+@click.option('--num-samples', default=20, type=int)
+@click.option('--runs', default=3, type=int)
+@click.option('--tolerance', default=0.05, type=float, help='相对 MAE 允许的最大偏差')
+def inference_backends_command(backends, batch_size, lookback, horizon, num_samples, runs, tolerance):
+    """对比各推理后端与 fp32 eager 的精度一致性与延迟"""
+    report = compare_backends(
+        _load_predenergy_checkpoint,
+        backends=[backend.strip() for backend in backends.split(',') if backend.strip()],
+        batch_size=batch_size,
+        lookback_length=lookback,
+        forecast_length=horizon,
+        num_samples=num_samples,
+        runs=runs,
+        tolerance=tolerance
+    )
+    
+    click.echo(f"{'backend':<10}{'first(s)':>10}{'median(s)':>11}{'speedup':>9}{'max_abs':>11}{'rel_mae':>10}  parity")
+    for entry in report:
+        if 'error' in entry:
+            click.echo(f"{entry['backend']:<10}  失败: {entry['error']}")
+            continue
+        click.echo(
+            f"{entry['backend']:<10}{entry['first_call_seconds']:>10.3f}{entry['median_seconds']:>11.3f}"
+            f"{entry['speedup']:>9.2f}{entry['max_abs_error']:>11.4g}{entry['relative_mae']:>10.4f}  "
+            f"{'通过' if entry['parity'] else '不一致'}"
+        )
+
+@click.command('inference-bench')
+@click.option('--url', default=None, help='被测服务地址（如 http://127.0.0.1:8080），默认在当前进程内调用接口')
+@click.option('--stub', is_flag=True, help='进程内压测时使用确定性替身模型，无需模型检查点')
+@click.option('--step-ms', default=0.0, type=float, help='替身模型每个解码步的模拟耗时（毫秒）')
+@click.option('--scenarios', default='predict', help=f'逗号分隔的压测场景: {",".join(benchmark.SCENARIOS)}')
+@click.option('--lookbacks', default='512')
+@click.option('--horizons', default='96')
+@click.option('--num-samples', default='20')
+@click.option('--concurrency', default='1,4,8')
+@click.option('--requests', 'request_count', default=32, type=int, help='每个参数组合的请求数')
+@click.option('--repeat', is_flag=True, help='所有请求使用相同数据，衡量缓存与请求合并的效果')
+@click.option('--output', default=None, type=click.Path(dir_okay=False), help='将结果另存为 JSON 文件')
+@with_appcontext
+def inference_bench_command(url, stub, step_ms, scenarios, lookbacks, horizons, num_samples, concurrency,
+                            request_count, repeat, output):
+    """压测预测 / 批量预测 / 回测接口，报告 p50/p95/p99 延迟与吞吐"""
+    def int_list(value):
+        return [int(item) for item in value.split(',') if item.strip()]
+    
+    local = threading.local()
+    if url:
+        def send(scenario, payload):
+            if not hasattr(local, 'session'):
+                local.session = requests.Session()
+            response = local.session.post(url.rstrip('/') + benchmark.ENDPOINTS[scenario], json=payload, timeout=300)
+            return response.ok and response.json().get('success', False)
+    else:
+        global stub_step_ms
+        if stub:
+            stub_step_ms = step_ms
+            model_manager.reload()
+        app = current_app._get_current_object()
+        
+        def send(scenario, payload):
+            if not hasattr(local, 'client'):
+                local.client = app.test_client()
+            response = local.client.post(benchmark.ENDPOINTS[scenario], json=payload)
+            return response.status_code == 200 and response.get_json().get('success', False)
+    
+    results = []
+    click.echo(f"{'scenario':<10}{'lookback':>9}{'horizon':>8}{'samples':>8}{'conc':>6}"
+               f"{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'req/s':>9}{'failed':>8}")
+    for result in benchmark.sweep(
+        send,
+        scenarios=[item.strip() for item in scenarios.split(',') if item.strip()],
+        lookbacks=int_list(lookbacks),
+        horizons=int_list(horizons),
+        num_samples_list=int_list(num_samples),
+        concurrency_list=int_list(concurrency),
+        requests=request_count,
+        repeat=repeat
+    ):
+        results.append(result)
+        click.echo(
+            f"{result['scenario']:<10}{result['lookback']:>9}{result['horizon']:>8}{result['num_samples']:>8}"
+            f"{result['concurrency']:>6}{result['p50_ms']:>10}{result['p95_ms']:>10}{result['p99_ms']:>10}"
+            f"{result['throughput_rps']:>9}{result['failures']:>8}"
+        )
+        if result['first_error']:
+            click.echo(f"  首个请求异常: {result['first_error']}")
+    
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        click.echo(f'结果已保存到 {output}')
+
+def load_model(wait=True, timeout=None):
+    """获取Predenergy模型，加载中时等待，加载失败时返回 None"""
+    return model_manager.get_model(wait=wait, timeout=timeout)
+
+def _model_unavailable_message(manager=model_manager):
+    if manager.state == ModelManager.FAILED:
+        return f'模型加载失败: {manager.error}'
+    if manager.state in (ModelManager.LOADING, ModelManager.WARMING):
+        return '模型加载中，请稍后重试'
+    return '模型未加载'
+
+def _acquire_model(model_version, timeout=None):
+    """获取指定模型版本并确保已加载，返回 (manager, error)
+
+    指定版本时管理器计为使用中、不会被换出，使用结束后须调用 _release_model。
+    """
+    if model_version is None:
+        if load_model(timeout=timeout) is None:
+            return model_manager, _model_unavailable_message()
+        return model_manager, None
+    
+    try:
+        version_id = int(model_version)
+    except (TypeError, ValueError):
+        return None, '模型版本无效'
+    version = db.session.get(ModelVersion, version_id)
+    if version is None or version.status != 'active':
+        return None, f'模型版本不存在或未启用: {model_version}'
+    
+    # 检查点路径优先取版本参数中的 checkpoint_path，否则为模型目录下以版本号命名的子目录
+    checkpoint_path = (version.parameters or {}).get('checkpoint_path') or os.path.join(
+        current_app.config.get('INFERENCE_MODEL_DIR'), str(version_id)
+    )
+    manager = get_model_registry().acquire(version_id, checkpoint_path, timeout=timeout)
+    if manager.model is None:
+        return manager, _model_unavailable_message(manager)
+    return manager, None
+
+def _release_model(manager):
+    """释放 _acquire_model 取得的模型版本，默认模型无需释放"""
+    if manager is not None and manager is not model_manager:
+        get_model_registry().release(manager)
+
+@contextmanager
+def model_in_use(model_version, timeout=None):
+    """在 with 块内持有模型版本，产出 (manager, error)"""
+    manager, error = _acquire_model(model_version, timeout=timeout)
+    try:
+        yield manager, error
+    finally:
+        _release_model(manager)
+
+def _generate_batch(batch, forecast_length, num_samples=20, manager=model_manager):
+    """对 [B, L] 批量历史数据执行一次 generate，返回 [B, num_samples, forecast_length]
+
+    manager 为请求取得的模型管理器，批次在执行期间沿用该管理器，不按版本号重新查找。
+    """
+    model = manager.get_model()
     if model is None:
+        raise RuntimeError('模型加载失败')
+    
+    with torch.no_grad():
+        forecast = model.generate(
+            torch.from_numpy(batch),
+            max_new_tokens=forecast_length,
+            num_samples=num_samples
+        )
+    return forecast.numpy()
+
+def get_batcher():
+    """获取当前进程的微批调度器"""
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = ForecastBatcher(
+                    _generate_batch,
+                    max_batch_size=current_app.config.get('INFERENCE_BATCH_MAX_SIZE', 8),
+                    max_wait_ms=current_app.config.get('INFERENCE_BATCH_MAX_WAIT_MS', 10)
+                )
+    return _batcher
+
+def get_forecast_cache():
+    """获取当前进程的预测结果缓存"""
+    global _forecast_cache
+    if _forecast_cache is None:
+        with _batcher_lock:
+            if _forecast_cache is None:
+                _forecast_cache = ForecastCache(
+                    max_entries=current_app.config.get('INFERENCE_CACHE_MAX_ENTRIES', 512),
+                    ttl_seconds=current_app.config.get('INFERENCE_CACHE_TTL', 600),
+                    max_bytes=current_app.config.get('INFERENCE_CACHE_MAX_MB', 64) * 1024 * 1024
+                )
+    return _forecast_cache
+
+def get_single_flight():
+    """获取当前进程的相同预测请求合并器"""
+    global _single_flight
+    if _single_flight is None:
+        with _batcher_lock:
+            if _single_flight is None:
+                _single_flight = SingleFlight()
+    return _single_flight
+
+def get_dataset_store():
+    """获取当前进程的示例数据集列式缓存"""
+    global _dataset_store
+    if _dataset_store is None:
+        with _batcher_lock:
+            if _dataset_store is None:
+                project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+                _dataset_store = DatasetStore(
+                    current_app.config.get('INFERENCE_DATASET_DIR') or os.path.join(project_root, 'dataset'),
+                    SAMPLE_DATASETS,
+                    persist=current_app.config.get('INFERENCE_DATASET_PERSIST', True)
+                )
+                for name, file_name in current_app.config.get('INFERENCE_EXTRA_DATASETS', {}).items():
+                    _dataset_store.register(name, file_name)
+    return _dataset_store
+
+def get_model_registry():
+    """获取当前进程的多版本模型注册表"""
+    global _model_registry
+    if _model_registry is None:
+        # 缓存的懒加载同样需要 _batcher_lock（不可重入），须在加锁之前取得
+        cache = get_forecast_cache()
+        with _batcher_lock:
+            if _model_registry is None:
+                budget_mb = current_app.config.get('INFERENCE_MODEL_MEMORY_BUDGET_MB')
+                _model_registry = ModelRegistry(
+                    _load_predenergy,
+                    warmup=_warmup_predenergy,
+                    sizeof=_model_weight_bytes,
+                    max_resident=current_app.config.get('INFERENCE_MAX_RESIDENT_MODELS', 2),
+                    memory_budget_bytes=budget_mb * 1024 * 1024 if budget_mb else None,
+                    # 换出的版本其缓存预测一并失效
+                    on_evict=lambda manager: cache.invalidate_model(manager.name),
+                    retry_after=current_app.config.get('INFERENCE_MODEL_RETRY_SECONDS', 30)
+                )
+    return _model_registry
+
+def get_job_executor():
+    """获取当前进程的异步预测任务线程池"""
+    global _job_executor
+    if _job_executor is None:
+        with _batcher_lock:
+            if _job_executor is None:
+                _job_executor = ThreadPoolExecutor(
+                    max_workers=current_app.config.get('INFERENCE_JOB_WORKERS', 2),
+                    thread_name_prefix='forecast-job'
+                )
+    return _job_executor
+
+def model_identity(manager=model_manager):
+    return f'{manager.name}:{manager.generation}'
+
+def forecast_many(lookbacks, forecast_length, num_samples=20, manager=model_manager):
+    """返回各历史窗口的预测采样 [num_samples, forecast_length]
+
+    逐条查询缓存，未命中的窗口一次性提交给微批调度器合并推理；
+    其他请求正在计算相同窗口时不重复提交，等待其结果。manager 须在调用期间保持使用中。
+    """
+    cache = get_forecast_cache()
+    cache.bind_model(manager.name, manager.generation)
+    
+    keys = [
+        ForecastCache.make_key(
+            lookback, manager.name, manager.generation, forecast_length=forecast_length, num_samples=num_samples
+        )
+        for lookback in lookbacks
+    ]
+    forecasts = [cache.get(key) for key in keys]
+    
+    flight = get_single_flight()
+    missing, waiting = [], []
+    for index, forecast in enumerate(forecasts):
+        if forecast is None:
+            future, is_leader = flight.claim(keys[index])
+            (missing if is_leader else waiting).append((index, future))
+    
+    if missing:
         try:
-            # 从本地 Predenergy 目录加载自定义模型实现
-            project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-            local_model_path = os.path.join(project_root, 'Predenergy')
-            model = AutoModelForCausalLM.from_pretrained(local_model_path, trust_remote_code=True)
-            print("Predenergy 模型加载成功")
+            results = get_batcher().submit_many(
+                [lookbacks[index] for index, _ in missing],
+                forecast_length=forecast_length,
+                num_samples=num_samples,
+                manager=manager
+            )
         except Exception as e:
-            print(f"模型加载失败: {e}")
-            model = None
-    return model
+            for index, _ in missing:
+                flight.resolve(keys[index], error=e)
+            raise
+        for (index, _), forecast in zip(missing, results):
+            cache.put(keys[index], forecast, model_name=manager.name)
+            flight.resolve(keys[index], forecast)
+            forecasts[index] = forecast
+    
+    for index, future in waiting:
+        forecasts[index] = future.result()
+    return forecasts
 
 @api_bp.route('/inference/sample-data/<dataset_name>', methods=['GET'])
 def get_sample_data(dataset_name):
     """获取示例数据集"""
     try:
-        # 数据集文件路径
-        dataset_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'dataset')
-        
-        # 支持的数据集
-        datasets = {
-            'ETTh2': 'ETTh2.csv',
-            'Electricity': 'Electricity.csv',
-            'Wind': 'Wind.csv',
-            'ETTh1': 'ETTh1.csv',
-            'ETTm1': 'ETTm1.csv',
-            'ETTm2': 'ETTm2.csv'
-        }
+        store = get_dataset_store()
         
-        if dataset_name not in datasets:
+        if dataset_name not in store:
             return jsonify({
                 'success': False,
                 'message': f'不支持的数据集: {dataset_name}'
             })
         
-        file_path = os.path.join(dataset_path, datasets[dataset_name])
+        file_path = store.path(dataset_name)
         
         if not os.path.exists(file_path):
             return jsonify({
@@ -56,11 +427,17 @@ def get_sample_data(dataset_name):
                 'message': f'数据集文件不存在: {file_path}'
             })
         
-        # 读取CSV文件
-        df = pd.read_csv(file_path)
+        # 从列式缓存读取，CSV 仅在首次访问或文件变更后解析
+        dataset = store.get(dataset_name)
+        
+        # 指定列、窗口或降采样参数时只返回该切片，并使用 {列名: [值]} 的列式结构
+        window_args = ('columns', 'offset', 'limit', 'downsample')
+        binary_format = _negotiate_binary_format()
+        if binary_format or any(arg in request.args for arg in window_args):
+            return _sample_data_window(dataset, binary_format)
         
         # 转换为字典列表格式
-        data = df.to_dict('records')
+        data = dataset.records()
         
         return jsonify({
             'success': True,
@@ -74,12 +451,186 @@ def get_sample_data(dataset_name):
             'message': f'加载数据集失败: {str(e)}'
         })
 
+def _negotiate_binary_format():
+    """根据 Accept 头协商二进制响应格式，返回 None 表示使用默认的 JSON"""
+    binary_format = array_codec.negotiate(request.accept_mimetypes)
+    if binary_format == array_codec.ARROW_STREAM and not array_codec.arrow_available():
+        return None
+    return binary_format
+
+def _sample_data_window(dataset, binary_format=None):
+    """按 columns/offset/limit/downsample 参数返回数据集切片"""
+    columns = request.args.get('columns')
+    columns = [name.strip() for name in columns.split(',') if name.strip()] if columns else None
+    if columns is None and binary_format == array_codec.NPY:
+        # NPY 只能承载数值列，未指定列时默认返回全部数值列
+        columns = [name for name, values in dataset.columns.items() if values.dtype.kind == 'f']
+    offset = max(0, request.args.get('offset', 0, type=int))
+    limit = request.args.get('limit', type=int)
+    downsample = request.args.get('downsample', type=int)
+    
+    total_rows = dataset.num_rows
+    offset = min(offset, total_rows)
+    window_rows = total_rows - offset if limit is None else min(max(0, limit), total_rows - offset)
+    
+    # 降采样：按固定步长抽取，使返回点数不超过 downsample
+    step = 1
+    if downsample and downsample > 0 and window_rows > downsample:
+        step = -(-window_rows // downsample)
+    
+    try:
+        window = dataset.window(columns, offset=offset, limit=window_rows, step=step)
+    except KeyError as e:
+        return jsonify({
+            'success': False,
+            'message': f'列不存在: {e.args[0]}'
+        })
+    
+    if binary_format:
+        try:
+            return array_codec.columns_response(binary_format, window, metadata={
+                'total_rows': total_rows,
+                'offset': offset,
+                'limit': window_rows,
+                'step': step
+            })
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            })
+    
+    return jsonify({
+        'success': True,
+        'columns': {name: values.tolist() for name, values in window.items()},
+        'available_columns': dataset.column_names,
+        'total_rows': total_rows,
+        'offset': offset,
+        'limit': window_rows,
+        'step': step,
+        'message': f'成功加载数据集: {dataset.name}'
+    })
+
+def _to_numeric_array(values):
+    """转换为 float64 数组并去除缺失值"""
+    if values.dtype.kind != 'f':
+        values = pd.to_numeric(values, errors='coerce')
+    values = np.asarray(values, dtype=np.float64)
+    return values[~np.isnan(values)]
+
+def _read_payload():
+    """读取推理请求体
+
+    - text/csv：逐行解析 CSV，只保留查询参数中指定的目标列，其余参数同样取自查询参数
+    - application/json：安装 ijson 时增量解析，data 不物化为行记录列表，只保留目标列的 float32 数组
+    未安装 ijson 时按普通 JSON 整体解析。
+    """
+    if not request.content_length and 'chunked' not in request.headers.get('Transfer-Encoding', ''):
+        return None
+    
+    query = payload.query_params(request.args)
+    keep = payload.columns_from_params(query)
+    if request.mimetype == 'text/csv':
+        return {**query, 'data': payload.parse_csv_payload(request.stream, keep=keep)}
+    if request.is_json and payload.streaming_available():
+        return {**query, **payload.parse_json_payload(request.stream, keep=keep)}
+    return request.get_json()
+
+def _resolve_target_series(data):
+    """解析预测输入序列，返回 ({目标变量: 数值数组}, 错误信息)
+
+    支持两种输入：
+    - {dataset, column, start, end}：从服务端数据集缓存按列切片，无需客户端回传数据
+    - {data, target_variable}：客户端上传的行记录列表 [{列名: 值}] 或列数组 {列名: [值]}
+    指定 targets（列名列表或 "all"）时同时解析多个目标变量，"all" 表示全部数值列。
+    """
+    dataset_name = data.get('dataset')
+    targets = data.get('targets')
+    if targets is None:
+        target_variable = data.get('column') or data.get('target_variable')
+        targets = [target_variable] if target_variable else []
+    
+    if dataset_name:
+        store = get_dataset_store()
+        if dataset_name not in store:
+            return None, f'不支持的数据集: {dataset_name}'
+        if not targets:
+            return None, '缺少必要参数'
+        
+        dataset = store.get(dataset_name)
+        if targets == 'all':
+            targets = [name for name, values in dataset.columns.items() if values.dtype.kind == 'f']
+        for target in targets:
+            if target not in dataset.columns:
+                return None, f'目标变量 {target} 不存在'
+        
+        start, end = data.get('start'), data.get('end')
+        return {target: _to_numeric_array(dataset.columns[target][start:end]) for target in targets}, None
+    
+    csv_data = data.get('data', [])
+    if not csv_data or not targets:
+        return None, '缺少必要参数'
+    
+    # 列数组 {列名: [值]}（CSV 请求体与增量解析的 JSON 请求体均转换为该形式）
+    if isinstance(csv_data, dict):
+        if targets == 'all':
+            targets = [name for name, values in csv_data.items() if len(column_values(values))]
+        for target in targets:
+            if target not in csv_data:
+                return None, f'目标变量 {target} 不存在'
+        return {target: column_values(csv_data[target]) for target in targets}, None
+    
+    # 转换为DataFrame
+    df = pd.DataFrame(csv_data)
+    
+    if targets == 'all':
+        numeric = df.apply(pd.to_numeric, errors='coerce')
+        targets = [column for column in df.columns if numeric[column].notna().any()]
+    
+    # 检查目标变量是否存在
+    for target in targets:
+        if target not in df.columns:
+            return None, f'目标变量 {target} 不存在'
+    
+    return {target: pd.to_numeric(df[target], errors='coerce').dropna().values for target in targets}, None
+
+def _prepare_window(target_values, start_position, forecast_length):
+    """按起始位置截取历史窗口与对应的真实值"""
+    lookback_length = min(1024, len(target_values) - forecast_length)
+    if start_position + lookback_length > len(target_values):
+        start_position = len(target_values) - lookback_length - forecast_length
+    
+    if start_position < 0:
+        start_position = 0
+    
+    # 提取历史数据
+    lookback_data = target_values[start_position:start_position + lookback_length]
+    
+    # 获取真实值（如果存在）
+    groundtruth_start = start_position + lookback_length
+    groundtruth_end = min(groundtruth_start + forecast_length, len(target_values))
+    groundtruth = target_values[groundtruth_start:groundtruth_end]
+    
+    # 如果真实值不足，用NaN填充
+    if len(groundtruth) < forecast_length:
+        groundtruth = np.concatenate([
+            groundtruth,
+            np.full(forecast_length - len(groundtruth), np.nan)
+        ])
+    
+    return {
+        'start_position': start_position,
+        'lookback_length': lookback_length,
+        'history': lookback_data,
+        'groundtruth': groundtruth
+    }
+
 @api_bp.route('/inference/predict', methods=['POST'])
 def inference_predict():
     """执行时序预测"""
     try:
         # 获取请求数据
-        data = request.get_json()
+        data = _read_payload()
         
         if not data:
             return jsonify({
@@ -88,115 +639,619 @@ def inference_predict():
             })
         
         # 提取参数
-        csv_data = data.get('data', [])
-        target_variable = data.get('target_variable')
         start_position = data.get('start_position', 0)
         mid_position = data.get('mid_position', 0)
         forecast_length = data.get('forecast_length', 100)
+        multi_target = data.get('targets') is not None
         
-        if not csv_data or not target_variable:
+        # 采样数可按需降低以节省计算，分位数由同一批采样计算，不增加前向计算次数
+        num_samples, quantiles, error = parse_sampling(data, current_app.config)
+        if error:
             return jsonify({
                 'success': False,
-                'message': '缺少必要参数'
+                'message': error
             })
         
-        # 转换为DataFrame
-        df = pd.DataFrame(csv_data)
+        # 提取目标变量的数值数据：优先使用服务端数据集引用，否则解析请求中的 data
+        series, error = _resolve_target_series(data)
+        if error:
+            return jsonify({
+                'success': False,
+                'message': error
+            })
         
-        # 检查目标变量是否存在
-        if target_variable not in df.columns:
+        for target, target_values in series.items():
+            if len(target_values) == 0:
+                return jsonify({
+                    'success': False,
+                    'message': f'目标变量 {target} 没有有效的数值数据' if multi_target else '目标变量没有有效的数值数据'
+                })
+        
+        # 异步模式：创建预测任务后立即返回任务编号，由后台线程池完成推理并写入预测结果
+        if data.get('async'):
+            return _submit_forecast_jobs(data, series, start_position, forecast_length, num_samples)
+        
+        # 加载模型（可通过 model_version 指定已注册的模型版本）：加载中时限时等待，加载失败时快速返回
+        model_version = data.get('model_version')
+        with model_in_use(model_version, timeout=current_app.config.get('INFERENCE_MODEL_WAIT_TIMEOUT')) as (manager, error):
+            if error:
+                return jsonify({
+                    'success': False,
+                    'message': error
+                })
+            
+            # 准备输入数据
+            windows = {
+                target: _prepare_window(target_values, start_position, forecast_length)
+                for target, target_values in series.items()
+            }
+            
+            # 执行预测 - 各目标变量叠成一批，命中缓存的直接返回，其余经微批调度器合并为一次批量 generate
+            forecasts = forecast_many(
+                [window['history'] for window in windows.values()], forecast_length,
+                num_samples=num_samples, manager=manager
+            )
+        
+        # 处理预测结果 - 每个 forecast shape: [num_samples, forecast_length]，取样本均值作为点预测
+        for window, forecast in zip(windows.values(), forecasts):
+            window['prediction'] = forecast.mean(axis=0)
+        if quantiles:
+            for window, bands in zip(windows.values(), sample_quantiles(forecasts, quantiles)):
+                window['quantiles'] = bands
+        
+        # 请求二进制格式时，按标签对齐输出 float32 列，避免逐个浮点数的 JSON 序列化
+        binary_format = _negotiate_binary_format()
+        if binary_format:
+            return _forecast_binary_response(
+                binary_format, windows, forecast_length, prefixed=multi_target, quantiles=quantiles
+            )
+        
+        if multi_target:
+            result = {
+                'targets': {
+                    target: {
+                        'history': window['history'].tolist(),
+                        'prediction': window['prediction'].tolist(),
+                        'groundtruth': window['groundtruth'].tolist(),
+                        'start_position': window['start_position'],
+                        'lookback_length': window['lookback_length'],
+                        **({'quantiles': window['quantiles'].tolist()} if quantiles else {})
+                    } for target, window in windows.items()
+                },
+                'forecast_length': forecast_length
+            }
+        else:
+            window = next(iter(windows.values()))
+            start_position = window['start_position']
+            lookback_length = window['lookback_length']
+            
+            # 准备返回数据
+            history_labels = list(range(start_position, start_position + lookback_length))
+            forecast_labels = list(range(start_position + lookback_length, start_position + lookback_length + forecast_length))
+            
+            result = {
+                'labels': history_labels + forecast_labels,
+                'history': window['history'].tolist(),
+                'prediction': window['prediction'].tolist(),
+                'groundtruth': window['groundtruth'].tolist(),
+                'start_position': start_position,
+                'lookback_length': lookback_length,
+                'forecast_length': forecast_length
+            }
+            if quantiles:
+                result['quantiles'] = window['quantiles'].tolist()
+        
+        # 分位数按 quantile_levels 的顺序给出，每个分位数一行
+        result['num_samples'] = num_samples
+        if quantiles:
+            result['quantile_levels'] = quantiles
+        
+        return jsonify({
+            'success': True,
+            'result': result,
+            'message': '预测完成'
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'预测失败: {str(e)}'
+        })
+
+@api_bp.route('/inference/predict/stream', methods=['POST'])
+def inference_predict_stream():
+    """以 Server-Sent Events 推送预测结果：先发送历史窗口，再随自回归解码逐块推送预测值"""
+    manager = None
+    try:
+        data = _read_payload()
+        
+        if not data:
+            return jsonify({
+                'success': False,
+                'message': '请求数据为空'
+            })
+        
+        if data.get('targets') is not None:
             return jsonify({
                 'success': False,
-                'message': f'目标变量 {target_variable} 不存在'
+                'message': '流式预测仅支持单个目标变量'
             })
         
-        # 提取目标变量的数值数据
-        target_values = pd.to_numeric(df[target_variable], errors='coerce').dropna().values
+        start_position = data.get('start_position', 0)
+        forecast_length = int(data.get('forecast_length', 100))
+        try:
+            chunk_size = data.get('chunk_size')
+            chunk_size = int(current_app.config.get('INFERENCE_STREAM_CHUNK_SIZE', 32) if chunk_size is None else chunk_size)
+        except (TypeError, ValueError):
+            chunk_size = 0
+        if chunk_size < 1:
+            return jsonify({
+                'success': False,
+                'message': 'chunk_size 必须为正整数'
+            })
+        # 超过预测长度的分块等同于一次完整解码
+        chunk_size = min(chunk_size, max(forecast_length, 1))
+        num_samples, quantiles, error = parse_sampling(data, current_app.config)
+        if error:
+            return jsonify({
+                'success': False,
+                'message': error
+            })
         
+        series, error = _resolve_target_series(data)
+        if error:
+            return jsonify({
+                'success': False,
+                'message': error
+            })
+        target_values = next(iter(series.values()))
         if len(target_values) == 0:
             return jsonify({
                 'success': False,
                 'message': '目标变量没有有效的数值数据'
             })
         
-        # 加载模型
-        model = load_model()
-        if model is None:
+        model_version = data.get('model_version')
+        manager, error = _acquire_model(model_version, timeout=current_app.config.get('INFERENCE_MODEL_WAIT_TIMEOUT'))
+        if error:
+            _release_model(manager)
             return jsonify({
                 'success': False,
-                'message': '模型加载失败'
+                'message': error
             })
+        model = manager.model
         
-        # 准备输入数据
-        lookback_length = min(1024, len(target_values) - forecast_length)
-        if start_position + lookback_length > len(target_values):
-            start_position = len(target_values) - lookback_length - forecast_length
+        window = _prepare_window(target_values, start_position, forecast_length)
         
-        if start_position < 0:
-            start_position = 0
+        # 与 /inference/predict 共用预测缓存与请求合并：缓存中已有一次完整解码的结果时直接按块切分；
+        # 分块解码每块重新采样并截断上下文，结果与完整解码不同，因此以解码方式与块大小单独缓存，
+        # 不会写入 /inference/predict 的缓存键。相同窗口正由其他流式请求解码时等待其结果，
+        # 否则由本请求分块解码，完成后写入缓存并唤醒等待者
+        cache = get_forecast_cache()
+        cache.bind_model(manager.name, manager.generation)
+        params = {'forecast_length': forecast_length, 'num_samples': num_samples}
+        full_key = ForecastCache.make_key(window['history'], manager.name, manager.generation, **params)
+        key = ForecastCache.make_key(
+            window['history'], manager.name, manager.generation, decode='chunked', chunk_size=chunk_size, **params
+        )
+        cached = cache.get(full_key)
+        if cached is None:
+            cached = cache.get(key)
+        is_leader = False
+        if cached is not None:
+            chunks = _result_chunks(lambda: cached, forecast_length, chunk_size)
+        else:
+            future, is_leader = get_single_flight().claim(key)
+            if is_leader:
+                chunks = _decode_and_share(
+                    model, window['history'], forecast_length, chunk_size, num_samples, key, future, manager.name
+                )
+            else:
+                chunks = _result_chunks(future.result, forecast_length, chunk_size)
         
-        # 提取历史数据
-        lookback_data = target_values[start_position:start_position + lookback_length]
-        lookback_tensor = torch.tensor(lookback_data).unsqueeze(0).float()
+    except Exception as e:
+        _release_model(manager)
+        return jsonify({
+            'success': False,
+            'message': f'预测失败: {str(e)}'
+        })
+    
+    def generate():
+        start, lookback_length = window['start_position'], window['lookback_length']
+        yield sse_event('meta', {
+            'labels': list(range(start, start + lookback_length + forecast_length)),
+            'history': window['history'].tolist(),
+            'groundtruth': [finite_or_none(value) for value in window['groundtruth']],
+            'start_position': start,
+            'lookback_length': lookback_length,
+            'forecast_length': forecast_length,
+            'chunk_size': chunk_size,
+            'num_samples': num_samples,
+            'quantile_levels': quantiles
+        })
         
-        # 执行预测 - 使用正确的 Predenergy pipeline
-        with torch.no_grad():
-            forecast = model.generate(
-                lookback_tensor, 
-                max_new_tokens=forecast_length, 
-                num_samples=20
-            )
+        # 完整结果只由实际收到的分块拼接
+        means, bands = [], []
+        try:
+            for offset, samples in chunks:
+                mean = samples.mean(axis=0)
+                means.append(mean)
+                chunk = {'offset': offset, 'prediction': mean.tolist()}
+                if quantiles:
+                    chunk_bands = sample_quantiles([samples], quantiles)[0]
+                    bands.append(chunk_bands)
+                    chunk['quantiles'] = chunk_bands.tolist()
+                yield sse_event('chunk', chunk)
+        except Exception as e:
+            yield sse_event('error', {'message': f'预测失败: {str(e)}'})
+            return
+        finally:
+            # 客户端中途断开时显式关闭分块生成器，由本请求解码时会完成剩余部分并唤醒等待者
+            chunks.close()
+        
+        received = sum(len(mean) for mean in means)
+        if received != forecast_length:
+            yield sse_event('error', {'message': f'预测失败: 仅收到 {received}/{forecast_length} 步预测'})
+            return
+        
+        done = {'prediction': np.concatenate(means).tolist() if means else [], 'message': '预测完成'}
+        if quantiles:
+            done['quantiles'] = np.concatenate(bands, axis=1).tolist() if bands else [[] for _ in quantiles]
+        yield sse_event('done', done)
+    
+    response = Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        # 关闭反向代理缓冲，保证每个分块立即送达客户端
+        'X-Accel-Buffering': 'no'
+    })
+    # 模型版本在整个流式响应期间保持使用中，响应关闭（含客户端断开）时释放
+    response.call_on_close(lambda: _release_model(manager))
+    if is_leader:
+        # 响应未被迭代就关闭时解码不会开始，此时通知等待者失败，避免其一直等待；
+        # 本请求已完成解码时 future 已结束，不影响之后新登记该键的计算
+        response.call_on_close(
+            lambda: get_single_flight().resolve(key, error=RuntimeError('流式预测已中断'), future=future)
+        )
+    return response
+
+def _result_chunks(get_result, forecast_length, chunk_size):
+    """把完整的预测采样 [num_samples, forecast_length] 按块切分产出；get_result 在开始迭代时才调用"""
+    samples = get_result()
+    for offset in range(0, forecast_length, chunk_size):
+        yield offset, samples[:, offset:offset + chunk_size]
+
+def _decode_and_share(model, history, forecast_length, chunk_size, num_samples, key, future, model_name):
+    """分块解码并逐块产出，全部解码完成后写入预测缓存并把结果交给等待相同窗口的请求
+
+    客户端中途断开（生成器被关闭）时不再产出，但继续完成剩余解码，等待者与缓存仍能得到完整结果。
+    """
+    flight = get_single_flight()
+    samples = np.empty((num_samples, forecast_length), dtype=np.float32)
+    closed = False
+    try:
+        for offset, chunk in decode_in_chunks(
+            model, history, forecast_length, chunk_size=chunk_size, num_samples=num_samples
+        ):
+            samples[:, offset:offset + chunk.shape[1]] = chunk
+            if not closed:
+                try:
+                    yield offset, chunk
+                except GeneratorExit:
+                    closed = True
+    except Exception as e:
+        flight.resolve(key, error=e, future=future)
+        if closed:
+            return
+        raise
+    
+    get_forecast_cache().put(key, samples, model_name=model_name)
+    flight.resolve(key, samples, future=future)
+
+def _optional_user_id():
+    """请求携带有效令牌时返回当前用户，否则返回 None"""
+    try:
+        verify_jwt_in_request(optional=True)
+        return get_jwt_identity()
+    except Exception:
+        return None
+
+def _submit_forecast_jobs(data, series, start_position, forecast_length, num_samples=20):
+    """为每个目标变量创建一条预测任务并提交到后台线程池"""
+    created_by = _optional_user_id()
+    now = datetime.now()
+    tasks = {}
+    for target in series:
+        task = PredictionTask(
+            created_by=created_by,
+            task_type='inference',
+            start_time=now,
+            end_time=now,
+            model_version=model_manager.name if data.get('model_version') is None else f"version-{data['model_version']}",
+            parameters={
+                'dataset': data.get('dataset'),
+                'model_version': data.get('model_version'),
+                'start_position': start_position,
+                'forecast_length': forecast_length,
+                'num_samples': num_samples,
+                'progress': 0
+            },
+            target=target,
+            scenario=data.get('scenario', 'inference'),
+            status='pending'
+        )
+        db.session.add(task)
+        tasks[target] = task
+    
+    try:
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': f'创建预测任务失败: {str(e)}'
+        })
+    
+    app = current_app._get_current_object()
+    executor = get_job_executor()
+    for target, task in tasks.items():
+        executor.submit(
+            _run_forecast_job, app, task.task_id, series[target], start_position, forecast_length,
+            data.get('freq', 'h'), data.get('forecast_start'), data.get('model_version'), num_samples
+        )
+    
+    task_ids = {target: task.task_id for target, task in tasks.items()}
+    result = {'task_ids': task_ids} if data.get('targets') is not None else {'task_id': next(iter(task_ids.values()))}
+    return jsonify({
+        'success': True,
+        'result': {**result, 'status': 'pending'},
+        'message': '预测任务已提交'
+    })
+
+def _update_task(task, status, progress, **extra):
+    task.status = status
+    task.parameters = {**(task.parameters or {}), 'progress': progress, **extra}
+    db.session.commit()
+
+def _run_forecast_job(app, task_id, target_values, start_position, forecast_length, freq, forecast_start,
+                      model_version=None, num_samples=20):
+    """后台执行预测任务，完成后批量写入 PredictionResult"""
+    with app.app_context():
+        task = db.session.get(PredictionTask, task_id)
+        try:
+            _update_task(task, 'running', 0)
+            
+            with model_in_use(model_version, timeout=app.config.get('INFERENCE_MODEL_WAIT_TIMEOUT')) as (manager, error):
+                if error:
+                    raise RuntimeError(error)
+                task.model_version = model_identity(manager)
+                _update_task(task, 'running', 10)
+                
+                window = _prepare_window(target_values, start_position, forecast_length)
+                forecast = forecast_many(
+                    [window['history']], forecast_length, num_samples=num_samples, manager=manager
+                )[0]
+                prediction = forecast.mean(axis=0)
+            _update_task(task, 'running', 90)
+            
+            # 批量写入预测结果，真实值存在时同时记录相对误差
+            timestamps = pd.date_range(start=forecast_start or task.start_time, periods=forecast_length, freq=freq)
+            rows = []
+            for timestamp, predicted, actual in zip(timestamps, prediction.tolist(), window['groundtruth'].tolist()):
+                has_actual = not np.isnan(actual)
+                rows.append({
+                    'task_id': task_id,
+                    'timestamp': timestamp.to_pydatetime(),
+                    'predicted_value': predicted,
+                    'actual_value': actual if has_actual else None,
+                    'error_rate': abs(predicted - actual) / abs(actual) if has_actual and actual != 0 else None
+                })
+            db.session.execute(insert(PredictionResult), rows)
+            
+            task.end_time = datetime.now()
+            _update_task(task, 'completed', 100, lookback_length=window['lookback_length'])
+        except Exception as e:
+            db.session.rollback()
+            task = db.session.get(PredictionTask, task_id)
+            task.end_time = datetime.now()
+            _update_task(task, 'failed', (task.parameters or {}).get('progress', 0), error=str(e))
+        finally:
+            db.session.remove()
+
+def _forecast_binary_response(binary_format, windows, forecast_length, prefixed=False, quantiles=()):
+    """以二进制格式返回预测结果
+
+    history/prediction/groundtruth 对齐到同一组标签（长度 lookback + forecast），
+    各自不覆盖的部分填充 NaN。多目标变量时列名为 "<目标变量>.<字段>"，要求各目标窗口一致。
+    请求分位数时每个分位数额外输出一列 "q<分位数>"。
+    """
+    first = next(iter(windows.values()))
+    start_position, lookback_length = first['start_position'], first['lookback_length']
+    if any(w['start_position'] != start_position or w['lookback_length'] != lookback_length for w in windows.values()):
+        raise ValueError('二进制格式要求各目标变量的有效数据长度一致')
+    
+    total = lookback_length + forecast_length
+    columns = {'label': np.arange(start_position, start_position + total, dtype=np.float32)}
+    for target, window in windows.items():
+        prefix = f'{target}.' if prefixed else ''
+        history = columns[f'{prefix}history'] = np.full(total, np.nan, dtype=np.float32)
+        prediction = columns[f'{prefix}prediction'] = np.full(total, np.nan, dtype=np.float32)
+        groundtruth = columns[f'{prefix}groundtruth'] = np.full(total, np.nan, dtype=np.float32)
+        history[:lookback_length] = window['history']
+        prediction[lookback_length:] = window['prediction']
+        groundtruth[lookback_length:] = window['groundtruth']
+        for level, band in zip(quantiles, window.get('quantiles', ())):
+            column = columns[f'{prefix}q{level:g}'] = np.full(total, np.nan, dtype=np.float32)
+            column[lookback_length:] = band
+    
+    return array_codec.columns_response(binary_format, columns, metadata={
+        'start_position': start_position,
+        'lookback_length': lookback_length,
+        'forecast_length': forecast_length
+    })
+
+@api_bp.route('/inference/backtest', methods=['POST'])
+def inference_backtest():
+    """滚动起点回测：批量预测多个历史窗口并在服务端计算误差指标"""
+    try:
+        data = _read_payload()
+        
+        if not data:
+            return jsonify({
+                'success': False,
+                'message': '请求数据为空'
+            })
+        
+        if data.get('targets') is not None:
+            return jsonify({
+                'success': False,
+                'message': '回测仅支持单个目标变量'
+            })
         
-        # 处理预测结果 - forecast shape: [1, 20, forecast_length]
-        forecast_values = forecast[0].mean(dim=0).numpy()  # 取20个样本的平均值
+        series, error = _resolve_target_series(data)
+        if error:
+            return jsonify({
+                'success': False,
+                'message': error
+            })
+        target_values = next(iter(series.values()))
         
-        # 获取真实值（如果存在）
-        groundtruth_start = start_position + lookback_length
-        groundtruth_end = min(groundtruth_start + forecast_length, len(target_values))
-        groundtruth = target_values[groundtruth_start:groundtruth_end]
+        lookback = int(data.get('lookback', 512))
+        horizon = int(data.get('horizon', 96))
+        stride = int(data.get('stride', horizon))
+        start = int(data.get('start', 0))
+        max_windows = current_app.config.get('INFERENCE_BACKTEST_MAX_WINDOWS', 512)
         
-        # 如果真实值不足，用NaN填充
-        if len(groundtruth) < forecast_length:
-            groundtruth = np.concatenate([
-                groundtruth,
-                np.full(forecast_length - len(groundtruth), np.nan)
-            ])
+        if not 0 < lookback <= 1024 or horizon <= 0 or stride <= 0 or start < 0:
+            return jsonify({
+                'success': False,
+                'message': '回测参数无效'
+            })
         
-        # 准备返回数据
-        history_labels = list(range(start_position, start_position + lookback_length))
-        forecast_labels = list(range(start_position + lookback_length, start_position + lookback_length + forecast_length))
+        num_samples, _, error = parse_sampling(data, current_app.config)
+        if error:
+            return jsonify({
+                'success': False,
+                'message': error
+            })
+        
+        # 指定 dataset 时 _resolve_target_series 已按 start/end 切片，窗口从切片开头取；上传数据时从 start 处取
+        offset = 0 if data.get('dataset') else start
+        windows = int(data.get('windows', max_windows))
+        if len(target_values) - offset < lookback + horizon or windows <= 0:
+            return jsonify({
+                'success': False,
+                'message': '数据长度不足以构成回测窗口'
+            })
+        
+        segments = backtest_segments(target_values, lookback, horizon, stride, offset, min(windows, max_windows))
+        windows = len(segments)
+        
+        model_version = data.get('model_version')
+        with model_in_use(model_version, timeout=current_app.config.get('INFERENCE_MODEL_WAIT_TIMEOUT')) as (manager, error):
+            if error:
+                return jsonify({
+                    'success': False,
+                    'message': error
+                })
+            
+            # 回测窗口直接交给微批调度器按批推理，不写入预测缓存
+            forecasts = get_batcher().submit_many(
+                list(segments[:, :lookback]), forecast_length=horizon, num_samples=num_samples, manager=manager
+            )
+        prediction = np.stack(forecasts).mean(axis=1)
+        per_window, aggregate = error_metrics(prediction, segments[:, lookback:])
         
         result = {
-            'labels': history_labels + forecast_labels,
-            'history': lookback_data.tolist(),
-            'prediction': forecast_values.tolist(),
-            'groundtruth': groundtruth.tolist(),
-            'start_position': start_position,
-            'lookback_length': lookback_length,
-            'forecast_length': forecast_length
+            'windows': [{
+                'start': start + index * stride,
+                'mse': finite_or_none(per_window['mse'][index]),
+                'mae': finite_or_none(per_window['mae'][index]),
+                'mape': finite_or_none(per_window['mape'][index])
+            } for index in range(windows)],
+            'aggregate': aggregate,
+            'lookback': lookback,
+            'horizon': horizon,
+            'stride': stride,
+            'window_count': windows
         }
+        if data.get('return_predictions'):
+            result['predictions'] = prediction.tolist()
         
         return jsonify({
             'success': True,
             'result': result,
-            'message': '预测完成'
+            'message': '回测完成'
         })
         
     except Exception as e:
         return jsonify({
             'success': False,
-            'message': f'预测失败: {str(e)}'
+            'message': f'回测失败: {str(e)}'
+        })
+
+@api_bp.route('/inference/metrics', methods=['GET'])
+def get_inference_metrics():
+    """获取推理调度指标"""
+    try:
+        return jsonify({
+            'success': True,
+            'metrics': {
+                'model': model_manager.status(),
+                'batcher': get_batcher().stats(),
+                'cache': get_forecast_cache().stats(),
+                'single_flight': get_single_flight().stats(),
+                'datasets': get_dataset_store().stats(),
+                'models': get_model_registry().stats()
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'获取推理指标失败: {str(e)}'
+        })
+
+def _model_weight_bytes(model):
+    """统计模型参数与缓冲区占用的字节数"""
+    if model is None or not hasattr(model, 'parameters'):
+        return None
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+@api_bp.route('/inference/memory', methods=['GET'])
+def get_inference_memory():
+    """获取当前 worker 的内存页统计；scope=workers 时汇总 master 下全部 worker"""
+    try:
+        report = {
+            'worker': process_memory(),
+            'model_weight_bytes': _model_weight_bytes(model_manager.model),
+            'shared_model': current_app.config.get('INFERENCE_SHARED_MODEL', False)
+        }
+        if request.args.get('scope') == 'workers':
+            report.update(workers_memory(os.getppid()))
+        
+        return jsonify({
+            'success': True,
+            'memory': report
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'获取内存信息失败: {str(e)}'
         })
 
 @api_bp.route('/inference/model-info', methods=['GET'])
 def get_model_info():
     """获取模型信息"""
     try:
-        model = load_model()
+        model = load_model(wait=False)
         if model is None:
             return jsonify({
                 'success': False,
-                'message': '模型未加载'
+                'message': _model_unavailable_message(),
+                'status': model_manager.status(),
+                'resources': resource_manager.info()
             })
         
         info = {
@@ -207,7 +1262,10 @@ def get_model_info():
             'capabilities': ['Zero-shot Time Series Forecasting', 'Multi-step Prediction'],
             'supported_formats': ['CSV'],
             'max_input_length': 1024,
-            'max_forecast_length': 1000
+            'max_forecast_length': 1000,
+            'backend': inference_backend,
+            'status': model_manager.status(),
+            'resources': resource_manager.info()
         }
         
         return jsonify({
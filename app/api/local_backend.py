@@ -0,0 +1,185 @@
+from contextlib import contextmanager
+import numpy as np
+from flask import current_app
+from .inference import model_in_use, forecast_many, model_identity, get_batcher
+from ..services.forecasting import (
+    finite_or_none, column_values, parse_sampling, sample_quantiles, backtest_segments, error_metrics
+)
+
+# /model/predict 与 /model/evaluate 的进程内后端：直接使用本进程的 Predenergy（及已注册的模型版本），
+# 复用推理接口的缓存、请求合并与微批调度，返回与模型服务相同结构的结果。
+# inputData / testData 可以是单条序列 [值]、多条序列 [[值]] 或按名称的序列 {名称: [值]}。
+LOCAL_METRICS = ('mse', 'mae', 'rmse', 'mape')
+MAX_LOOKBACK = 1024
+
+def backend_for(data):
+    """请求中的 backend 优先，否则取配置 MODEL_PREDICT_BACKEND（remote / local）"""
+    backend = (data.get('backend') or current_app.config.get('MODEL_PREDICT_BACKEND', 'remote')).lower()
+    if backend not in ('remote', 'local'):
+        raise ValueError(f'不支持的预测后端: {backend}')
+    return backend
+
+def _series_from(values):
+    """解析输入序列，返回 ({名称: float32 数组}, 是否为单条序列)"""
+    if isinstance(values, dict):
+        series = {str(name): column_values(column) for name, column in values.items()}
+        single = False
+    elif isinstance(values, list) and values and all(isinstance(item, (list, tuple)) for item in values):
+        series = {str(index): column_values(item) for index, item in enumerate(values)}
+        single = False
+    elif isinstance(values, list) and values:
+        series = {'0': column_values(values)}
+        single = True
+    else:
+        raise ValueError('输入数据需为非空序列、序列列表或 {名称: 序列}')
+
+    for name, column in series.items():
+        if len(column) == 0:
+            raise ValueError(f'序列 {name} 没有有效的数值数据')
+    return series, single
+
+def _reshape(values, names, single, keyed):
+    """把按序列排列的结果还原为与输入相同的结构"""
+    if single:
+        return values[0]
+    if keyed:
+        return dict(zip(names, values))
+    return list(values)
+
+def _version_id(data):
+    """模型版本：请求顶层的 versionId，兼容放在 parameters 中的写法"""
+    return data.get('versionId') or (data.get('parameters') or {}).get('versionId')
+
+@contextmanager
+def _model_for(version_id):
+    """在 with 块内持有模型版本，产出已加载的 manager；加载失败时抛出 RuntimeError"""
+    with model_in_use(version_id, timeout=current_app.config.get('INFERENCE_MODEL_WAIT_TIMEOUT')) as (manager, error):
+        if error:
+            raise RuntimeError(error)
+        yield manager
+
+def local_predict(data):
+    """本地预测，返回 {'predictions', 'confidence', 'metadata'}
+
+    parameters 支持 forecastLength（默认 96）、numSamples 与 quantiles（置信区间上下分位数，默认 [0.1, 0.9]）；
+    versionId 指定已注册的模型版本。点预测为采样均值，历史超过 1024 个点时只取最近部分。
+    """
+    parameters = data.get('parameters') or {}
+    input_data = data.get('inputData')
+    series, single = _series_from(input_data)
+    forecast_length = int(parameters.get('forecastLength', parameters.get('forecast_length', 96)))
+    if forecast_length <= 0:
+        raise ValueError('forecastLength 需大于 0')
+
+    num_samples, quantiles, error = parse_sampling({
+        'num_samples': parameters.get('numSamples', current_app.config.get('INFERENCE_NUM_SAMPLES', 20)),
+        'quantiles': parameters.get('quantiles') or [0.1, 0.9]
+    }, current_app.config)
+    if error:
+        raise ValueError(error)
+    if len(quantiles) != 2:
+        raise ValueError('quantiles 需为置信区间的上下两个分位数')
+
+    version_id = _version_id(data)
+    names = list(series)
+    with _model_for(version_id) as manager:
+        model = model_identity(manager)
+        forecasts = forecast_many(
+            [series[name][-MAX_LOOKBACK:] for name in names], forecast_length,
+            num_samples=num_samples, manager=manager
+        )
+    predictions = [forecast.mean(axis=0).tolist() for forecast in forecasts]
+    bands = sample_quantiles(forecasts, sorted(quantiles))
+    keyed = isinstance(input_data, dict)
+
+    return {
+        'predictions': _reshape(predictions, names, single, keyed),
+        'confidence': {
+            'levels': sorted(quantiles),
+            'lower': _reshape([band[0].tolist() for band in bands], names, single, keyed),
+            'upper': _reshape([band[1].tolist() for band in bands], names, single, keyed)
+        },
+        'metadata': {
+            'backend': 'local',
+            'model': model,
+            'forecastLength': forecast_length,
+            'numSamples': num_samples
+        }
+    }
+
+def local_evaluate(data):
+    """本地滚动起点回测评估，返回 {'metrics', 'details', 'metadata'}
+
+    parameters 支持 lookback（默认 512）、horizon（默认 96）、stride（默认等于 horizon）、
+    maxWindows（每条序列的最大窗口数）与 numSamples；versionId 指定已注册的模型版本。
+    全部序列的窗口合并为一次微批推理，metrics 为全部窗口的汇总指标，details 为各序列的指标。
+    """
+    parameters = data.get('parameters') or {}
+    test_data = data.get('testData')
+    series, single = _series_from(test_data)
+    requested = [metric for metric in data.get('metrics') or LOCAL_METRICS if metric in LOCAL_METRICS]
+
+    lookback = int(parameters.get('lookback', 512))
+    horizon = int(parameters.get('horizon', 96))
+    stride = int(parameters.get('stride', horizon))
+    max_windows = min(
+        int(parameters.get('maxWindows', current_app.config.get('INFERENCE_BACKTEST_MAX_WINDOWS', 512))),
+        current_app.config.get('INFERENCE_BACKTEST_MAX_WINDOWS', 512)
+    )
+    if not 0 < lookback <= MAX_LOOKBACK or horizon <= 0 or stride <= 0 or max_windows <= 0:
+        raise ValueError('评估参数无效')
+
+    num_samples, _, error = parse_sampling({
+        'num_samples': parameters.get('numSamples', current_app.config.get('INFERENCE_NUM_SAMPLES', 20))
+    }, current_app.config)
+    if error:
+        raise ValueError(error)
+
+    segments = {}
+    for name, values in series.items():
+        if len(values) < lookback + horizon:
+            raise ValueError(f'序列 {name} 长度不足以构成评估窗口（需要 {lookback + horizon} 个点）')
+        segments[name] = backtest_segments(values, lookback, horizon, stride, windows=max_windows)
+
+    version_id = _version_id(data)
+    # 回测窗口不写入预测缓存，直接交给微批调度器
+    windows = np.concatenate(list(segments.values()))
+    with _model_for(version_id) as manager:
+        model = model_identity(manager)
+        forecasts = get_batcher().submit_many(
+            list(windows[:, :lookback]), forecast_length=horizon, num_samples=num_samples, manager=manager
+        )
+    prediction = np.stack(forecasts).mean(axis=1)
+    actual = windows[:, lookback:]
+
+    def select(prediction, actual):
+        _, aggregate = error_metrics(prediction, actual)
+        if aggregate['mse'] is not None:
+            aggregate['rmse'] = finite_or_none(np.sqrt(aggregate['mse']))
+        else:
+            aggregate['rmse'] = None
+        return {metric: aggregate[metric] for metric in requested}
+
+    details = {}
+    offset = 0
+    for name, window in segments.items():
+        count = len(window)
+        details[name] = {
+            'windows': count,
+            'metrics': select(prediction[offset:offset + count], actual[offset:offset + count])
+        }
+        offset += count
+
+    return {
+        'metrics': select(prediction, actual),
+        'details': details[next(iter(details))] if single else details,
+        'metadata': {
+            'backend': 'local',
+            'model': model,
+            'lookback': lookback,
+            'horizon': horizon,
+            'stride': stride,
+            'windows': len(windows),
+            'numSamples': num_samples
+        }
+    }
@@ -1,14 +1,48 @@
-from flask import request, jsonify
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from . import api_bp
-# from ..models import ModelService, ModelVersion, ModelTraining, ModelDeployment
+from ..models import ModelVersion, ModelTraining, ModelDeployment
 from .. import db
-from datetime import datetime
-import requests
-import json
+from ..services.model_service import ModelServiceClient
+from .dispatch import notify_dispatcher
+from .status_sync import freshness
+from .local_backend import backend_for, local_predict, local_evaluate
 
-# 模型服务配置
-MODEL_SERVICE_URL = "http://model-service:8000"  # 时序预测大模型服务的地址
+# 进程内共享的模型服务客户端（连接池、超时、并发限制与熔断），首次调用时按配置创建
+_model_service = None
+_model_service_lock = threading.Lock()
+# 批量预测分片提交线程池
+_batch_executor = None
+
+def get_model_service():
+    """获取当前进程的模型服务客户端"""
+    global _model_service
+    if _model_service is None:
+        with _model_service_lock:
+            if _model_service is None:
+                config = current_app.config
+                _model_service = ModelServiceClient(
+                    config.get('MODEL_SERVICE_URL', 'http://model-service:8000'),
+                    timeouts=config.get('MODEL_SERVICE_TIMEOUTS'),
+                    default_timeout=config.get('MODEL_SERVICE_TIMEOUT', 30),
+                    connect_timeout=config.get('MODEL_SERVICE_CONNECT_TIMEOUT', 3),
+                    max_concurrency=config.get('MODEL_SERVICE_MAX_CONCURRENCY', 16),
+                    acquire_timeout=config.get('MODEL_SERVICE_ACQUIRE_TIMEOUT', 5),
+                    failure_threshold=config.get('MODEL_SERVICE_FAILURE_THRESHOLD', 5),
+                    reset_timeout=config.get('MODEL_SERVICE_RESET_TIMEOUT', 30)
+                )
+    return _model_service
+
+@api_bp.route('/model/service/metrics', methods=['GET'])
+@jwt_required()
+def get_model_service_metrics():
+    return jsonify({
+        'code': 200,
+        'msg': '查询成功',
+        'data': get_model_service().stats()
+    })
 
 @api_bp.route('/model/versions', methods=['GET'])
 @jwt_required()
@@ -64,44 +98,22 @@ def start_model_training():
     
     try:
         db.session.commit()
-        
-        # 异步调用模型服务进行训练
-        try:
-            response = requests.post(
-                f"{MODEL_SERVICE_URL}/train",
-                json={
-                    'trainingId': training.training_id,
-                    'modelType': training.model_type,
-                    'datasetConfig': training.dataset_config,
-                    'trainingParams': training.training_params
-                }
-            )
-            
-            if response.status_code == 200:
-                return jsonify({
-                    'code': 200,
-                    'msg': '训练任务已提交',
-                    'trainingId': training.training_id
-                })
-            else:
-                raise Exception(f"模型服务返回错误: {response.text}")
-                
-        except Exception as e:
-            training.status = 'failed'
-            training.error_message = str(e)
-            db.session.commit()
-            
-            return jsonify({
-                'code': 500,
-                'msg': f'提交训练任务失败: {str(e)}'
-            }), 500
-            
     except Exception as e:
         db.session.rollback()
         return jsonify({
             'code': 500,
             'msg': f'创建训练记录失败: {str(e)}'
         }), 500
+    
+    # 由后台分发作业提交训练任务，接口不等待模型服务
+    notice = notify_dispatcher()
+    
+    return jsonify({
+        'code': 200,
+        'msg': '训练任务已提交',
+        'trainingId': training.training_id,
+        **notice
+    })
 
 @api_bp.route('/model/train/<int:training_id>', methods=['GET'])
 @jwt_required()
@@ -114,43 +126,22 @@ def get_training_status(training_id):
             'msg': '训练记录不存在'
         }), 404
     
-    try:
-        # 从模型服务获取最新状态
-        response = requests.get(f"{MODEL_SERVICE_URL}/train/{training_id}/status")
-        
-        if response.status_code == 200:
-            status_data = response.json()
-            
-            # 更新训练记录
-            training.status = status_data.get('status', training.status)
-            training.progress = status_data.get('progress', training.progress)
-            training.metrics = status_data.get('metrics', training.metrics)
-            training.error_message = status_data.get('errorMessage', training.error_message)
-            
-            db.session.commit()
-            
-            return jsonify({
-                'code': 200,
-                'msg': '查询成功',
-                'data': {
-                    'trainingId': training.training_id,
-                    'modelType': training.model_type,
-                    'status': training.status,
-                    'progress': training.progress,
-                    'metrics': training.metrics,
-                    'errorMessage': training.error_message,
-                    'createdAt': training.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                    'updatedAt': training.updated_at.strftime('%Y-%m-%d %H:%M:%S') if training.updated_at else None
-                }
-            })
-        else:
-            raise Exception(f"模型服务返回错误: {response.text}")
-            
-    except Exception as e:
-        return jsonify({
-            'code': 500,
-            'msg': f'获取训练状态失败: {str(e)}'
-        }), 500
+    # 状态由后台同步作业从模型服务批量刷新，这里直接返回库中记录
+    return jsonify({
+        'code': 200,
+        'msg': '查询成功',
+        'data': {
+            'trainingId': training.training_id,
+            'modelType': training.model_type,
+            'status': training.status,
+            'progress': training.progress,
+            'metrics': training.metrics,
+            'errorMessage': training.error_message,
+            'createdAt': training.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'updatedAt': training.updated_at.strftime('%Y-%m-%d %H:%M:%S') if training.updated_at else None,
+            **freshness('train', training)
+        }
+    })
 
 @api_bp.route('/model/deploy', methods=['POST'])
 @jwt_required()
@@ -170,44 +161,22 @@ def deploy_model():
     
     try:
         db.session.commit()
-        
-        # 调用模型服务进行部署
-        try:
-            response = requests.post(
-                f"{MODEL_SERVICE_URL}/deploy",
-                json={
-                    'deploymentId': deployment.deployment_id,
-                    'versionId': deployment.version_id,
-                    'environment': deployment.environment,
-                    'config': deployment.config
-                }
-            )
-            
-            if response.status_code == 200:
-                return jsonify({
-                    'code': 200,
-                    'msg': '部署任务已提交',
-                    'deploymentId': deployment.deployment_id
-                })
-            else:
-                raise Exception(f"模型服务返回错误: {response.text}")
-                
-        except Exception as e:
-            deployment.status = 'failed'
-            deployment.error_message = str(e)
-            db.session.commit()
-            
-            return jsonify({
-                'code': 500,
-                'msg': f'提交部署任务失败: {str(e)}'
-            }), 500
-            
     except Exception as e:
         db.session.rollback()
         return jsonify({
             'code': 500,
             'msg': f'创建部署记录失败: {str(e)}'
         }), 500
+    
+    # 由后台分发作业提交部署任务
+    notice = notify_dispatcher()
+    
+    return jsonify({
+        'code': 200,
+        'msg': '部署任务已提交',
+        'deploymentId': deployment.deployment_id,
+        **notice
+    })
 
 @api_bp.route('/model/predict', methods=['POST'])
 @jwt_required()
@@ -215,30 +184,34 @@ def predict():
     data = request.get_json()
     
     try:
-        # 调用模型服务进行预测
-        response = requests.post(
-            f"{MODEL_SERVICE_URL}/predict",
-            json={
-                'modelType': data.get('modelType'),
-                'inputData': data.get('inputData'),
-                'parameters': data.get('parameters')
-            }
-        )
-        
-        if response.status_code == 200:
-            prediction_result = response.json()
-            
-            return jsonify({
-                'code': 200,
-                'msg': '预测成功',
-                'data': {
-                    'predictions': prediction_result.get('predictions'),
-                    'confidence': prediction_result.get('confidence'),
-                    'metadata': prediction_result.get('metadata')
-                }
-            })
+        if backend_for(data) == 'local':
+            # 使用本进程加载的模型预测，不经过模型服务
+            prediction_result = local_predict(data)
         else:
-            raise Exception(f"模型服务返回错误: {response.text}")
+            # 调用模型服务进行预测
+            response = get_model_service().post(
+                'predict', '/predict',
+                json={
+                    'modelType': data.get('modelType'),
+                    'versionId': data.get('versionId'),
+                    'inputData': data.get('inputData'),
+                    'parameters': data.get('parameters')
+                }
+            )
+            
+            if response.status_code != 200:
+                raise Exception(f"模型服务返回错误: {response.text}")
+            prediction_result = response.json()
+        
+        return jsonify({
+            'code': 200,
+            'msg': '预测成功',
+            'data': {
+                'predictions': prediction_result.get('predictions'),
+                'confidence': prediction_result.get('confidence'),
+                'metadata': prediction_result.get('metadata')
+            }
+        })
             
     except Exception as e:
         return jsonify({
@@ -246,35 +219,117 @@ def predict():
             'msg': f'预测失败: {str(e)}'
         }), 500
 
-@api_bp.route('/model/batch-predict', methods=['POST'])
-@jwt_required()
-def batch_predict():
-    data = request.get_json()
-    
+def get_batch_executor():
+    """获取批量预测分片并发提交的线程池，进程内共享以限制全部请求的总并发"""
+    global _batch_executor
+    if _batch_executor is None:
+        with _model_service_lock:
+            if _batch_executor is None:
+                _batch_executor = ThreadPoolExecutor(
+                    max_workers=current_app.config.get('MODEL_SERVICE_BATCH_PARALLELISM', 8),
+                    thread_name_prefix='batch-predict'
+                )
+    return _batch_executor
+
+def _predict_chunk(client, model_type, chunk, parameters):
+    """提交一个分片，返回 (预测结果, 元数据, 错误信息)"""
     try:
-        # 调用模型服务进行批量预测
-        response = requests.post(
-            f"{MODEL_SERVICE_URL}/batch-predict",
+        response = client.post(
+            'batch-predict', '/batch-predict',
             json={
-                'modelType': data.get('modelType'),
-                'inputDataList': data.get('inputDataList'),
-                'parameters': data.get('parameters')
+                'modelType': model_type,
+                'inputDataList': chunk,
+                'parameters': parameters
             }
         )
+        if response.status_code != 200:
+            return None, None, f'模型服务返回错误: {response.text}'
+
+        result = response.json()
+        predictions = result.get('predictions')
+        if not isinstance(predictions, list) or len(predictions) != len(chunk):
+            return None, None, f'模型服务返回的预测数与输入数不一致: {len(chunk)}'
+        return predictions, result.get('metadata'), None
+    except Exception as e:
+        return None, None, str(e)
+
+@api_bp.route('/model/batch-predict', methods=['POST'])
+@jwt_required()
+def batch_predict():
+    try:
+        # 缺少或无法解析的 JSON 请求体同样返回统一的错误结构
+        data = request.get_json()
+        input_data_list = data.get('inputDataList')
+        if not isinstance(input_data_list, list) or not input_data_list:
+            return jsonify({
+                'code': 400,
+                'msg': 'inputDataList 必须为非空列表'
+            }), 400
         
-        if response.status_code == 200:
-            prediction_results = response.json()
-            
+        chunk_size = data.get('chunkSize')
+        if chunk_size is None:
+            chunk_size = current_app.config.get('MODEL_SERVICE_BATCH_CHUNK_SIZE', 100)
+        try:
+            chunk_size = int(chunk_size)
+        except (TypeError, ValueError):
+            chunk_size = 0
+        if chunk_size < 1:
             return jsonify({
-                'code': 200,
-                'msg': '批量预测成功',
-                'data': {
-                    'predictions': prediction_results.get('predictions'),
-                    'metadata': prediction_results.get('metadata')
-                }
+                'code': 400,
+                'msg': 'chunkSize 必须为正整数'
+            }), 400
+        
+        # 按分片并发提交到模型服务，结果按原顺序拼接；失败分片对应位置为 None，不影响其他分片。
+        # metadata 保持模型服务返回的元数据对象（取首个成功分片），各分片的元数据见 chunkMetadata；
+        # chunkMetadata 与 failedChunks 均为按分片排列的列表，range 为分片在 inputDataList 中的 [起, 止)
+        chunks = [input_data_list[start:start + chunk_size] for start in range(0, len(input_data_list), chunk_size)]
+        client = get_model_service()
+        futures = [
+            get_batch_executor().submit(_predict_chunk, client, data.get('modelType'), chunk, data.get('parameters'))
+            for chunk in chunks
+        ]
+        
+        predictions = []
+        chunk_metadata_list = []
+        failed_chunks = []
+        for index, (chunk, future) in enumerate(zip(chunks, futures)):
+            chunk_predictions, chunk_metadata, error = future.result()
+            start = index * chunk_size
+            chunk_range = [start, start + len(chunk)]
+            if error is not None:
+                predictions.extend([None] * len(chunk))
+                failed_chunks.append({
+                    'chunk': index,
+                    'range': chunk_range,
+                    'error': error
+                })
+                continue
+            predictions.extend(chunk_predictions)
+            chunk_metadata_list.append({
+                'chunk': index,
+                'range': chunk_range,
+                'metadata': chunk_metadata
             })
-        else:
-            raise Exception(f"模型服务返回错误: {response.text}")
+        
+        if len(failed_chunks) == len(chunks):
+            return jsonify({
+                'code': 500,
+                'msg': f'批量预测失败: {failed_chunks[0]["error"]}',
+                'data': {'failedChunks': failed_chunks}
+            }), 500
+        
+        return jsonify({
+            'code': 200,
+            'msg': '批量预测成功' if not failed_chunks else f'批量预测部分失败: {len(failed_chunks)}/{len(chunks)} 个分片失败',
+            'data': {
+                'predictions': predictions,
+                'metadata': chunk_metadata_list[0]['metadata'],
+                'chunkMetadata': chunk_metadata_list,
+                'chunkSize': chunk_size,
+                'chunks': len(chunks),
+                'failedChunks': failed_chunks
+            }
+        })
             
     except Exception as e:
         return jsonify({
@@ -288,31 +343,34 @@ def evaluate_model():
     data = request.get_json()
     
     try:
-        # 调用模型服务进行评估
-        response = requests.post(
-            f"{MODEL_SERVICE_URL}/evaluate",
-            json={
-                'modelType': data.get('modelType'),
-                'versionId': data.get('versionId'),
-                'testData': data.get('testData'),
-                'metrics': data.get('metrics', ['mse', 'mae', 'rmse', 'mape'])
-            }
-        )
-        
-        if response.status_code == 200:
-            evaluation_result = response.json()
-            
-            return jsonify({
-                'code': 200,
-                'msg': '评估成功',
-                'data': {
-                    'metrics': evaluation_result.get('metrics'),
-                    'details': evaluation_result.get('details'),
-                    'metadata': evaluation_result.get('metadata')
-                }
-            })
+        if backend_for(data) == 'local':
+            # 使用本进程加载的模型做滚动起点回测评估
+            evaluation_result = local_evaluate(data)
         else:
-            raise Exception(f"模型服务返回错误: {response.text}")
+            # 调用模型服务进行评估
+            response = get_model_service().post(
+                'evaluate', '/evaluate',
+                json={
+                    'modelType': data.get('modelType'),
+                    'versionId': data.get('versionId'),
+                    'testData': data.get('testData'),
+                    'metrics': data.get('metrics', ['mse', 'mae', 'rmse', 'mape'])
+                }
+            )
+            
+            if response.status_code != 200:
+                raise Exception(f"模型服务返回错误: {response.text}")
+            evaluation_result = response.json()
+        
+        return jsonify({
+            'code': 200,
+            'msg': '评估成功',
+            'data': {
+                'metrics': evaluation_result.get('metrics'),
+                'details': evaluation_result.get('details'),
+                'metadata': evaluation_result.get('metadata')
+            }
+        })
             
     except Exception as e:
         return jsonify({
@@ -0,0 +1,219 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import jsonify, current_app
+from flask_jwt_extended import jwt_required
+from sqlalchemy import select, update, or_
+from . import api_bp
+from .. import db
+from ..models import ModelTraining, Dataset
+from ..services.model_service import ModelServiceError
+from ..services.scheduler import schedule_job
+
+# 训练与数据集任务的状态同步。GET 接口直接返回库中记录，由后台同步作业按批向模型服务查询执行中
+# 记录的最新状态并在一次提交中写回。优先使用批量查询接口（POST <batch_path>，请求体 {ids_field: [...]}，
+# 返回 {'items': [{id_field: ..., ...}]}），模型服务不支持（404/405/501）时退回逐条查询。
+# 同步时无论状态是否变化都刷新 updated_at，作为接口返回的数据新鲜度。
+# 远程状态按 statuses 表转换后写回：只允许进入执行中或终止状态，排队中（pending）等未列出的状态保留
+# 本地状态，同步不会把记录退回分发作业使用的 pending / dispatching，已提交的任务不会被重复提交。
+SYNC_KINDS = {
+    'train': {
+        'model': ModelTraining,
+        'key': 'training_id',
+        'active': ('running',),
+        'batch_operation': 'train-status-batch',
+        'batch_path': '/train/status/batch',
+        'ids_field': 'trainingIds',
+        'id_field': 'trainingId',
+        'operation': 'train-status',
+        'path': '/train/{}/status',
+        # 远程字段 -> 记录字段
+        'fields': {'status': 'status', 'progress': 'progress', 'metrics': 'metrics', 'errorMessage': 'error_message'},
+        # 远程状态 -> 记录状态
+        'statuses': {'running': 'running', 'completed': 'completed', 'failed': 'failed'}
+    },
+    'dataset': {
+        'model': Dataset,
+        'key': 'dataset_id',
+        'active': ('processing',),
+        'batch_operation': 'dataset-info-batch',
+        'batch_path': '/dataset/info/batch',
+        'ids_field': 'datasetIds',
+        'id_field': 'datasetId',
+        'operation': 'dataset-info',
+        'path': '/dataset/{}/info',
+        'fields': {'status': 'status', 'statistics': 'statistics', 'schema': 'schema', 'errorMessage': 'error_message'},
+        'statuses': {'processing': 'processing', 'running': 'processing', 'completed': 'completed', 'failed': 'failed'}
+    }
+}
+
+_sync_lock = threading.Lock()
+_last_run = None
+# 模型服务不支持批量查询的类型，本进程内不再尝试批量接口
+_batch_unsupported = set()
+
+def init_status_sync(app):
+    """按配置注册状态同步作业；只同步超过半个间隔未刷新的记录，多个 worker 同时同步时基本不会重复查询"""
+    schedule_job(
+        app, 'status_sync', sync_job_status,
+        app.config.get('STATUS_SYNC_INTERVAL_SECONDS', 10),
+        enabled=app.config.get('STATUS_SYNC_ENABLED', True)
+    )
+
+def freshness(kind, row):
+    """记录的同步时间与是否过期；执行中的记录超过 3 个同步间隔未刷新视为过期"""
+    synced_at = row.updated_at or row.created_at
+    stale = False
+    if getattr(row, 'status', None) in SYNC_KINDS[kind]['active']:
+        interval = current_app.config.get('STATUS_SYNC_INTERVAL_SECONDS', 10)
+        stale = synced_at is None or datetime.now() - synced_at > timedelta(seconds=3 * interval)
+    return {
+        'syncedAt': synced_at.strftime('%Y-%m-%d %H:%M:%S') if synced_at else None,
+        'stale': stale
+    }
+
+def _local_status(spec, remote, current):
+    """远程状态转换为记录状态；未列出的状态（排队中、未知状态）保留记录当前状态"""
+    return spec['statuses'].get(remote, current)
+
+def _fetch_batch(client, kind, spec, job_ids):
+    """批量查询一批记录的远程状态，返回 {主键: 状态}；不支持批量接口时返回 None"""
+    response = client.post(spec['batch_operation'], spec['batch_path'], json={spec['ids_field']: job_ids})
+    if response.status_code in (404, 405, 501):
+        _batch_unsupported.add(kind)
+        return None
+    if response.status_code != 200:
+        raise ModelServiceError(f'模型服务返回错误: {response.text}')
+    return {
+        int(item[spec['id_field']]): item
+        for item in response.json().get('items', []) if item.get(spec['id_field']) is not None
+    }
+
+def _fetch_one(client, spec, job_id):
+    response = client.get(spec['operation'], spec['path'].format(job_id))
+    if response.status_code != 200:
+        raise ModelServiceError(f'模型服务返回错误: {response.text}')
+    return response.json()
+
+def _fetch(client, kind, spec, job_ids, batch_size):
+    """查询各记录的远程状态，返回 ({主键: 状态}, 失败数)"""
+    states = {}
+    failures = 0
+    chunks = [job_ids[offset:offset + batch_size] for offset in range(0, len(job_ids), batch_size)]
+    pending = []
+    for chunk in chunks:
+        if kind in _batch_unsupported:
+            pending.extend(chunk)
+            continue
+        try:
+            result = _fetch_batch(client, kind, spec, chunk)
+        except ModelServiceError as e:
+            current_app.logger.warning(f'批量同步{kind}状态失败: {str(e)}')
+            failures += len(chunk)
+            continue
+        if result is None:
+            pending.extend(chunk)
+        else:
+            states.update(result)
+
+    if pending:
+        # 逐条查询时并发执行，并发上限由模型服务客户端的信号量控制
+        def fetch(job_id):
+            try:
+                return job_id, _fetch_one(client, spec, job_id)
+            except ModelServiceError:
+                return job_id, None
+
+        with ThreadPoolExecutor(max_workers=min(len(pending), client.max_concurrency)) as executor:
+            for job_id, state in executor.map(fetch, pending):
+                if state is None:
+                    failures += 1
+                else:
+                    states[job_id] = state
+    return states, failures
+
+def _sync_once():
+    from .model import get_model_service
+    client = get_model_service()
+    config = current_app.config
+    batch_size = config.get('STATUS_SYNC_BATCH_SIZE', 100)
+    interval = config.get('STATUS_SYNC_INTERVAL_SECONDS', 10)
+    cutoff = datetime.now() - timedelta(seconds=interval / 2)
+
+    stats = {'checked': 0, 'updated': 0, 'changed': 0, 'failed': 0}
+    updates = {}
+    for kind, spec in SYNC_KINDS.items():
+        model = spec['model']
+        key = getattr(model, spec['key'])
+        rows = db.session.execute(
+            select(model).where(
+                model.status.in_(spec['active']),
+                or_(model.updated_at.is_(None), model.updated_at <= cutoff)
+            ).order_by(key)
+        ).scalars().all()
+        if not rows:
+            continue
+
+        stats['checked'] += len(rows)
+        states, failures = _fetch(client, kind, spec, [getattr(row, spec['key']) for row in rows], batch_size)
+        stats['failed'] += failures
+
+        synced_at = datetime.now()
+        values = []
+        for row in rows:
+            state = states.get(getattr(row, spec['key']))
+            if state is None:
+                continue
+            value = {spec['key']: getattr(row, spec['key']), 'updated_at': synced_at}
+            for remote_field, column in spec['fields'].items():
+                value[column] = state.get(remote_field, getattr(row, column))
+            value['status'] = _local_status(spec, state.get('status'), row.status)
+            if any(value[column] != getattr(row, column) for column in spec['fields'].values()):
+                stats['changed'] += 1
+            values.append(value)
+        if values:
+            updates[model] = values
+        stats['updated'] += len(values)
+
+    # 全部类型的更新按主键批量执行，整轮只提交一次
+    for model, values in updates.items():
+        db.session.execute(update(model), values)
+    db.session.commit()
+    return stats
+
+def sync_job_status():
+    """同步一轮执行中的训练与数据集任务状态，返回统计；已有同步进行中时返回 None"""
+    global _last_run
+    if not _sync_lock.acquire(blocking=False):
+        return None
+
+    try:
+        started = time.perf_counter()
+        stats = _sync_once()
+        stats['seconds'] = round(time.perf_counter() - started, 3)
+        stats['finished_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        _last_run = stats
+        return stats
+
+    except Exception as e:
+        db.session.rollback()
+        _last_run = {'error': str(e), 'finished_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+        current_app.logger.error(f'状态同步失败: {str(e)}')
+        raise
+    finally:
+        _sync_lock.release()
+
+@api_bp.route('/model/jobs/sync-status', methods=['GET'])
+@jwt_required()
+def get_status_sync_status():
+    """获取状态同步作业的最近运行统计"""
+    return jsonify({
+        'code': 200,
+        'msg': '查询成功',
+        'data': {
+            'last_run': _last_run,
+            'running': _sync_lock.locked(),
+            'batch_unsupported': sorted(_batch_unsupported)
+        }
+    })
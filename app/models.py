@@ -122,6 +122,24 @@ class PredictionTask(db.Model):
     scenario = db.Column(db.String(50))
     status = db.Column(db.String(20))
 
+# 定时批量预测的调度时段表，以时段起点为主键保证每个时段只被一个进程执行
+class FleetForecastRun(db.Model):
+    __tablename__ = 'fleet_forecast_runs'
+    
+    slot_start = db.Column(db.DateTime, primary_key=True)
+    status = db.Column(db.String(20), default='running')  # running/completed/failed
+    started_at = db.Column(db.DateTime, default=datetime.now)
+    finished_at = db.Column(db.DateTime)
+    stats = db.Column(db.JSON)
+
+# 后台作业的心跳表：任务分发作业每轮结束后写入最近运行时间，供各进程判断是否有分发进程在运行
+class JobHeartbeat(db.Model):
+    __tablename__ = 'job_heartbeats'
+    
+    job_id = db.Column(db.String(50), primary_key=True)
+    last_run_at = db.Column(db.DateTime, nullable=False)
+    worker = db.Column(db.String(100))  # 主机名:进程号
+
 # 预测结果表
 class PredictionResult(db.Model):
     __tablename__ = 'prediction_results'
@@ -510,8 +528,12 @@ class FeatureEngineering(db.Model):
     engineering_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     dataset_id = db.Column(db.Integer, nullable=False)
     config = db.Column(db.JSON, nullable=False)
-    status = db.Column(db.String(20), default='pending')  # pending/running/completed/failed
+    status = db.Column(db.String(20), default='pending')  # pending/dispatching/running/completed/failed
     error_message = db.Column(db.Text)
+    # 后台分发状态：提交重试次数、下次可提交时间与分发进程抢占（dispatching）的时间
+    dispatch_attempts = db.Column(db.Integer, default=0)
+    next_dispatch_at = db.Column(db.DateTime)
+    claimed_at = db.Column(db.DateTime)
     created_by = db.Column(db.Integer, db.ForeignKey('users.user_id'))
     created_at = db.Column(db.DateTime, default=datetime.now)
     updated_at = db.Column(db.DateTime, onupdate=datetime.now)
@@ -526,8 +548,12 @@ class DataPreprocessing(db.Model):
     preprocessing_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     dataset_id = db.Column(db.Integer, nullable=False)
     config = db.Column(db.JSON, nullable=False)
-    status = db.Column(db.String(20), default='pending')  # pending/running/completed/failed
+    status = db.Column(db.String(20), default='pending')  # pending/dispatching/running/completed/failed
     error_message = db.Column(db.Text)
+    # 后台分发状态：提交重试次数、下次可提交时间与分发进程抢占（dispatching）的时间
+    dispatch_attempts = db.Column(db.Integer, default=0)
+    next_dispatch_at = db.Column(db.DateTime)
+    claimed_at = db.Column(db.DateTime)
     created_by = db.Column(db.Integer, db.ForeignKey('users.user_id'))
     created_at = db.Column(db.DateTime, default=datetime.now)
     updated_at = db.Column(db.DateTime, onupdate=datetime.now)
@@ -545,10 +571,14 @@ class Dataset(db.Model):
     source_type = db.Column(db.String(50), nullable=False)  # database/file/api
     source_config = db.Column(db.JSON, nullable=False)
     feature_config = db.Column(db.JSON)
-    status = db.Column(db.String(20), default='pending')  # pending/processing/completed/failed
+    status = db.Column(db.String(20), default='pending')  # pending/dispatching/processing/completed/failed
     statistics = db.Column(db.JSON)  # 数据集统计信息
     schema = db.Column(db.JSON)  # 数据模式
     error_message = db.Column(db.Text)
+    # 后台分发状态：提交重试次数、下次可提交时间与分发进程抢占（dispatching）的时间
+    dispatch_attempts = db.Column(db.Integer, default=0)
+    next_dispatch_at = db.Column(db.DateTime)
+    claimed_at = db.Column(db.DateTime)
     created_by = db.Column(db.Integer, db.ForeignKey('users.user_id'))
     created_at = db.Column(db.DateTime, default=datetime.now)
     updated_at = db.Column(db.DateTime, onupdate=datetime.now)
@@ -599,10 +629,14 @@ class ModelTraining(db.Model):
     model_type = db.Column(db.String(50), nullable=False)
     dataset_config = db.Column(db.JSON, nullable=False)
     training_params = db.Column(db.JSON, nullable=False)
-    status = db.Column(db.String(20), default='pending')  # pending/running/completed/failed
+    status = db.Column(db.String(20), default='pending')  # pending/dispatching/running/completed/failed
     progress = db.Column(db.Float, default=0.0)  # 训练进度 0-100
     metrics = db.Column(db.JSON)  # 训练指标
     error_message = db.Column(db.Text)
+    # 后台分发状态：提交重试次数、下次可提交时间与分发进程抢占（dispatching）的时间
+    dispatch_attempts = db.Column(db.Integer, default=0)
+    next_dispatch_at = db.Column(db.DateTime)
+    claimed_at = db.Column(db.DateTime)
     created_by = db.Column(db.Integer, db.ForeignKey('users.user_id'))
     created_at = db.Column(db.DateTime, default=datetime.now)
     updated_at = db.Column(db.DateTime, onupdate=datetime.now)
@@ -618,8 +652,12 @@ class ModelDeployment(db.Model):
     version_id = db.Column(db.Integer, db.ForeignKey('sys_model_version.version_id'), nullable=False)
     environment = db.Column(db.String(50), default='production')  # production/staging/test
     config = db.Column(db.JSON)
-    status = db.Column(db.String(20), default='pending')  # pending/deploying/active/failed
+    status = db.Column(db.String(20), default='pending')  # pending/dispatching/deploying/active/failed
     error_message = db.Column(db.Text)
+    # 后台分发状态：提交重试次数、下次可提交时间与分发进程抢占（dispatching）的时间
+    dispatch_attempts = db.Column(db.Integer, default=0)
+    next_dispatch_at = db.Column(db.DateTime)
+    claimed_at = db.Column(db.DateTime)
     deployed_by = db.Column(db.Integer, db.ForeignKey('users.user_id'))
     deployed_at = db.Column(db.DateTime, default=datetime.now)
     updated_at = db.Column(db.DateTime, onupdate=datetime.now)
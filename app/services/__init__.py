@@ -0,0 +1 @@
+# 推理与后台服务组件（批处理调度、模型生命周期、缓存等），供 api 蓝图调用
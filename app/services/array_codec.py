@@ -0,0 +1,100 @@
+import io
+from urllib.parse import quote
+
+import numpy as np
+from flask import Response
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow 为可选依赖，未安装时不提供 Arrow 格式
+    pa = None
+
+ARROW_STREAM = 'application/vnd.apache.arrow.stream'
+NPY = 'application/x-npy'
+JSON = 'application/json'
+BINARY_FORMATS = (ARROW_STREAM, NPY)
+
+
+def negotiate(accept):
+    """根据 Accept 头选择响应格式
+
+    只有显式请求 Arrow 或 NPY 时才返回对应的 MIME 类型，其余情况（含 */*）返回 None 表示使用 JSON。
+    """
+    for mimetype, quality in accept:
+        if quality <= 0:
+            continue
+        if mimetype in BINARY_FORMATS:
+            return mimetype
+        if mimetype == JSON:
+            return None
+    return None
+
+
+def arrow_available():
+    return pa is not None
+
+
+def npy_response(array, headers=None):
+    """将数组编码为 .npy 响应（WSGI 要求响应体为 bytes，头部与数据拼接后一次写出）"""
+    array = np.ascontiguousarray(array)
+    header = io.BytesIO()
+    np.lib.format.write_array_header_1_0(header, np.lib.format.header_data_from_array_1_0(array))
+    header = header.getvalue()
+
+    body = header + array.tobytes()
+    response = Response([body], mimetype=NPY, headers=headers)
+    response.headers['Content-Length'] = str(len(body))
+    return response
+
+
+def arrow_response(columns, metadata=None, headers=None):
+    """将 {列名: 数组} 编码为 Arrow IPC 流响应，数值列由 NumPy 缓冲区零拷贝构建"""
+    if pa is None:
+        raise RuntimeError('未安装 pyarrow，无法输出 Arrow 格式')
+
+    batch = pa.record_batch(
+        [pa.array(values) for values in columns.values()],
+        names=list(columns.keys())
+    )
+    if metadata:
+        batch = batch.replace_schema_metadata({str(k): str(v) for k, v in metadata.items()})
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    buffer = sink.getvalue()
+
+    body = buffer.to_pybytes()
+    response = Response([body], mimetype=ARROW_STREAM, headers=headers)
+    response.headers['Content-Length'] = str(len(body))
+    return response
+
+
+def columns_response(mimetype, columns, metadata=None):
+    """按协商出的二进制格式输出 {列名: 数组}，数值列统一为 float32
+
+    - Arrow：每列一个字段，元数据写入 schema metadata
+    - NPY：各列堆叠为 [列数, 行数] 的二维数组，列名与元数据放在 X-Columns / X-Meta-* 响应头中
+    """
+    metadata = metadata or {}
+    columns = {
+        name: values.astype(np.float32, copy=False) if values.dtype.kind in 'biuf' else values
+        for name, values in ((name, np.asarray(values)) for name, values in columns.items())
+    }
+
+    if mimetype == ARROW_STREAM:
+        return arrow_response(columns, metadata=metadata)
+
+    non_numeric = [name for name, values in columns.items() if values.dtype != np.float32]
+    if non_numeric:
+        raise ValueError(f'NPY 格式仅支持数值列: {", ".join(non_numeric)}')
+
+    headers = {'X-Columns': quote(','.join(columns.keys()))}
+    headers.update({f'X-Meta-{key}': quote(str(value)) for key, value in metadata.items()})
+    if len(columns) == 1:
+        array = next(iter(columns.values()))[np.newaxis]
+    elif columns:
+        array = np.stack(list(columns.values()))
+    else:
+        array = np.empty((0, 0), dtype=np.float32)
+    return npy_response(array, headers=headers)
@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class _PendingRequest:
+    __slots__ = ('series', 'params', 'key', 'future', 'enqueued_at')
+
+    def __init__(self, series, params):
+        self.series = series
+        self.params = params
+        self.key = tuple(sorted(params.items()))
+        self.future = Future()
+        self.enqueued_at = time.monotonic()
+
+
+class ForecastBatcher:
+    """动态微批调度器
+
+    在 max_wait_ms 时间窗口内收集参数兼容（如 forecast_length 相同）的预测请求，
+    将各自的历史序列左侧补齐到同一长度后合并为一次批量推理，再把结果按请求切片返回。
+    runner 签名为 runner(batch, **params)，batch 形状 [B, L]，返回 [B, ...]。
+    """
+
+    def __init__(self, runner, max_batch_size=8, max_wait_ms=10):
+        self._runner = runner
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+
+        # 统计指标
+        self._max_queue_depth = 0
+        self._batches = 0
+        self._requests = 0
+        self._failed_batches = 0
+        self._last_batch_size = 0
+
+    def submit(self, series, timeout=None, **params):
+        """提交单条序列并阻塞等待其预测结果"""
+        return self.submit_async(series, **params).result(timeout=timeout)
+
+    def submit_many(self, series_list, timeout=None, **params):
+        """一次性提交多条序列（如多变量的各列），按提交顺序返回各自的预测结果"""
+        futures = self.submit_many_async(series_list, **params)
+        return [future.result(timeout=timeout) for future in futures]
+
+    def submit_async(self, series, **params):
+        """提交单条序列，返回 Future"""
+        return self.submit_many_async([series], **params)[0]
+
+    def submit_many_async(self, series_list, **params):
+        """将多条序列原子地加入队列，返回对应的 Future 列表"""
+        pending = []
+        for series in series_list:
+            series = np.asarray(series, dtype=np.float32)
+            if series.ndim != 1 or series.size == 0:
+                raise ValueError('输入序列必须是非空的一维数组')
+            pending.append(_PendingRequest(series, params))
+
+        with self._cond:
+            self._ensure_worker()
+            self._queue.extend(pending)
+            self._max_queue_depth = max(self._max_queue_depth, len(self._queue))
+            self._cond.notify_all()
+        return [item.future for item in pending]
+
+    def stats(self):
+        """返回调度器配置与队列指标"""
+        with self._cond:
+            return {
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000.0,
+                'queue_depth': len(self._queue),
+                'max_queue_depth': self._max_queue_depth,
+                'batches': self._batches,
+                'requests': self._requests,
+                'failed_batches': self._failed_batches,
+                'avg_batch_size': round(self._requests / self._batches, 2) if self._batches else 0,
+                'last_batch_size': self._last_batch_size
+            }
+
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._worker, name='forecast-batcher', daemon=True)
+            self._thread.start()
+
+    def _compatible_count(self, key):
+        return sum(1 for item in self._queue if item.key == key)
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+
+            # 以队首请求为准，等待兼容请求凑满批次或窗口超时
+            head = self._queue[0]
+            deadline = head.enqueued_at + self.max_wait
+            while self._compatible_count(head.key) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch, rest = [], deque()
+            for item in self._queue:
+                if item.key == head.key and len(batch) < self.max_batch_size:
+                    batch.append(item)
+                else:
+                    rest.append(item)
+            self._queue = rest
+            return batch
+
+    def _worker(self):
+        while True:
+            batch = self._next_batch()
+            self._run_batch(batch)
+
+    def _run_batch(self, items):
+        # 用各序列首值左侧补齐到批内最大长度，避免补零拉低序列的归一化统计
+        length = max(item.series.shape[0] for item in items)
+        batch = np.empty((len(items), length), dtype=np.float32)
+        for row, item in enumerate(items):
+            pad = length - item.series.shape[0]
+            batch[row, :pad] = item.series[0]
+            batch[row, pad:] = item.series
+
+        try:
+            outputs = self._runner(batch, **items[0].params)
+        except Exception as e:
+            with self._cond:
+                self._failed_batches += 1
+            for item in items:
+                item.future.set_exception(e)
+            return
+
+        with self._cond:
+            self._batches += 1
+            self._requests += len(items)
+            self._last_batch_size = len(items)
+        for row, item in enumerate(items):
+            item.future.set_result(outputs[row])
@@ -0,0 +1,124 @@
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# 压测场景：
+# - predict：单目标预测
+# - batch：一次请求中多个目标变量（targets），服务端叠成一批推理
+# - backtest：滚动起点回测，一次请求包含多个窗口
+SCENARIOS = ('predict', 'batch', 'backtest')
+ENDPOINTS = {
+    'predict': '/api/inference/predict',
+    'batch': '/api/inference/predict',
+    'backtest': '/api/inference/backtest'
+}
+
+
+def synthetic_series(length, seed):
+    """带日周期与趋势的确定性合成序列"""
+    rng = np.random.default_rng(seed)
+    steps = np.arange(length)
+    values = 10 + 3 * np.sin(2 * np.pi * steps / 24) + 0.01 * steps + rng.normal(0, 0.3, length)
+    return np.round(values, 4).tolist()
+
+
+def build_payload(scenario, lookback, horizon, num_samples, seed, targets=4, windows=8):
+    """构造请求体；seed 不同则序列不同，避免请求命中预测缓存或被合并"""
+    if scenario == 'predict':
+        return {
+            'target_variable': 'value',
+            'forecast_length': horizon,
+            'num_samples': num_samples,
+            'data': {'value': synthetic_series(lookback + horizon, seed)}
+        }
+    if scenario == 'batch':
+        columns = [f'value_{index}' for index in range(targets)]
+        return {
+            'targets': columns,
+            'forecast_length': horizon,
+            'num_samples': num_samples,
+            'data': {column: synthetic_series(lookback + horizon, seed * targets + index)
+                     for index, column in enumerate(columns)}
+        }
+    if scenario == 'backtest':
+        return {
+            'target_variable': 'value',
+            'lookback': lookback,
+            'horizon': horizon,
+            'stride': horizon,
+            'windows': windows,
+            'num_samples': num_samples,
+            'data': {'value': synthetic_series(lookback + horizon * windows, seed)}
+        }
+    raise ValueError(f'不支持的压测场景: {scenario}')
+
+
+def _percentile(latencies, q):
+    return round(float(np.percentile(latencies, q)) * 1000, 2) if latencies else None
+
+
+def run_case(send, scenario, lookback, horizon, num_samples, concurrency, requests, seed=0, repeat=False):
+    """以 concurrency 个并发线程发送 requests 个请求，统计延迟分位数与吞吐
+
+    send(scenario, payload) 发送一次请求并返回是否成功，抛出异常（超时、连接失败等）也计为失败，
+    不中断压测；repeat 为 True 时所有请求使用相同数据，用于衡量缓存与请求合并的效果。
+    """
+    payloads = [
+        build_payload(scenario, lookback, horizon, num_samples, seed if repeat else seed + index)
+        for index in range(requests)
+    ]
+    latencies = []
+    failures = 0
+    first_error = None
+    lock = threading.Lock()
+
+    def task(payload):
+        nonlocal failures, first_error
+        started = time.perf_counter()
+        error = None
+        try:
+            ok = send(scenario, payload)
+        except Exception as e:
+            ok = False
+            error = f'{type(e).__name__}: {e}'
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            if not ok:
+                failures += 1
+            if error is not None and first_error is None:
+                first_error = error
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(task, payloads))
+    wall = time.perf_counter() - started
+
+    return {
+        'scenario': scenario,
+        'lookback': lookback,
+        'horizon': horizon,
+        'num_samples': num_samples,
+        'concurrency': concurrency,
+        'requests': requests,
+        'failures': failures,
+        'first_error': first_error,
+        'p50_ms': _percentile(latencies, 50),
+        'p95_ms': _percentile(latencies, 95),
+        'p99_ms': _percentile(latencies, 99),
+        'throughput_rps': round(requests / wall, 2) if wall > 0 else None,
+        'wall_seconds': round(wall, 3)
+    }
+
+
+def sweep(send, scenarios, lookbacks, horizons, num_samples_list, concurrency_list, requests, repeat=False):
+    """对各参数组合逐一压测，逐个产出结果"""
+    cases = itertools.product(scenarios, lookbacks, horizons, num_samples_list, concurrency_list)
+    for seed, (scenario, lookback, horizon, num_samples, concurrency) in enumerate(cases):
+        yield run_case(
+            send, scenario, lookback, horizon, num_samples, concurrency, requests,
+            seed=seed * requests, repeat=repeat
+        )
@@ -0,0 +1,209 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+class ColumnarDataset:
+    """以 NumPy 列数组形式保存的数据集"""
+
+    def __init__(self, name, columns, source_mtime, source_size):
+        self.name = name
+        # 列名 -> 一维数组，保持 CSV 中的列顺序
+        self.columns = columns
+        self.source_mtime = source_mtime
+        self.source_size = source_size
+
+    @property
+    def column_names(self):
+        return list(self.columns.keys())
+
+    @property
+    def num_rows(self):
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self.columns.values())
+
+    def window(self, columns=None, offset=0, limit=None, step=1):
+        """按列投影并截取行窗口，返回 {列名: 数组视图}，不复制数据"""
+        names = columns or self.column_names
+        missing = [name for name in names if name not in self.columns]
+        if missing:
+            raise KeyError(', '.join(missing))
+
+        stop = self.num_rows if limit is None else min(self.num_rows, offset + limit)
+        return {name: self.columns[name][offset:stop:step] for name in names}
+
+    def records(self):
+        """转换为与 df.to_dict('records') 相同结构的字典列表"""
+        names = self.column_names
+        values = [array.tolist() for array in self.columns.values()]
+        return [dict(zip(names, row)) for row in zip(*values)]
+
+
+class DatasetStore:
+    """示例数据集的列式缓存
+
+    每个 CSV 只解析一次为 NumPy 列数组并常驻内存；开启 persist 时同时在 CSV 旁的
+    .cache 目录写入 .npy 文件，之后以内存映射方式加载，进程重启或多进程间无需重复解析。
+    源文件修改时间或大小变化时缓存自动失效。
+
+    磁盘缓存按源文件版本（修改时间与大小）分目录存放，已写出的文件不再原地修改：
+    其他进程仍在内存映射的旧版本文件不会被截断或覆盖。
+    """
+
+    CACHE_DIR = '.cache'
+
+    def __init__(self, base_dir, datasets=None, persist=True):
+        self.base_dir = base_dir
+        self.persist = persist
+        self._files = dict(datasets or {})
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._loads = 0
+        self._disk_loads = 0
+
+    def register(self, name, file_name):
+        """注册数据集，file_name 可为相对 base_dir 的文件名或绝对路径"""
+        with self._lock:
+            self._files[name] = file_name
+            self._loaded.pop(name, None)
+
+    def names(self):
+        return list(self._files.keys())
+
+    def __contains__(self, name):
+        return name in self._files
+
+    def path(self, name):
+        return os.path.join(self.base_dir, self._files[name])
+
+    def get(self, name):
+        """获取列式数据集；名称未注册时抛出 KeyError，文件不存在时抛出 FileNotFoundError"""
+        file_path = self.path(name)
+        stat = os.stat(file_path)
+
+        dataset = self._loaded.get(name)
+        if dataset is not None and self._is_fresh(dataset, stat):
+            self._hits += 1
+            return dataset
+
+        with self._lock:
+            dataset = self._loaded.get(name)
+            if dataset is not None and self._is_fresh(dataset, stat):
+                self._hits += 1
+                return dataset
+
+            dataset = self._load_persisted(name, stat) if self.persist else None
+            if dataset is None:
+                dataset = self._parse_csv(name, file_path, stat)
+                if self.persist:
+                    self._persist(dataset)
+            self._loaded[name] = dataset
+            return dataset
+
+    def stats(self):
+        return {
+            'datasets': {
+                name: {'rows': dataset.num_rows, 'columns': len(dataset.columns), 'bytes': dataset.nbytes}
+                for name, dataset in self._loaded.items()
+            },
+            'hits': self._hits,
+            'csv_loads': self._loads,
+            'disk_loads': self._disk_loads,
+            'persist': self.persist
+        }
+
+    @staticmethod
+    def _is_fresh(dataset, stat):
+        return dataset.source_mtime == stat.st_mtime and dataset.source_size == stat.st_size
+
+    def _parse_csv(self, name, file_path, stat):
+        df = pd.read_csv(file_path)
+        columns = {}
+        for column in df.columns:
+            series = df[column]
+            if pd.api.types.is_numeric_dtype(series):
+                columns[str(column)] = series.to_numpy(dtype=np.float64)
+            else:
+                columns[str(column)] = series.astype(str).to_numpy(dtype=str)
+        self._loads += 1
+        return ColumnarDataset(name, columns, stat.st_mtime, stat.st_size)
+
+    def _cache_root(self, name):
+        return os.path.join(os.path.dirname(self.path(name)), self.CACHE_DIR, name)
+
+    def _cache_path(self, name, source_mtime, source_size):
+        return os.path.join(self._cache_root(name), f'{int(source_mtime * 1e9)}-{source_size}')
+
+    def _load_persisted(self, name, stat):
+        cache_path = self._cache_path(name, stat.st_mtime, stat.st_size)
+        try:
+            with open(os.path.join(cache_path, 'manifest.json'), encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest['source_mtime'] != stat.st_mtime or manifest['source_size'] != stat.st_size:
+                return None
+
+            columns = {}
+            for index, column in enumerate(manifest['columns']):
+                columns[column] = np.load(os.path.join(cache_path, f'{index}.npy'), mmap_mode='r')
+        except (OSError, ValueError, KeyError):
+            return None
+
+        self._disk_loads += 1
+        return ColumnarDataset(name, columns, stat.st_mtime, stat.st_size)
+
+    @staticmethod
+    def _replace(path, write):
+        """先写入同目录下的临时文件再原子替换，读者只会看到完整的旧文件或新文件"""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _persist(self, dataset):
+        cache_root = self._cache_root(dataset.name)
+        cache_path = self._cache_path(dataset.name, dataset.source_mtime, dataset.source_size)
+        try:
+            os.makedirs(cache_path, exist_ok=True)
+            for index, array in enumerate(dataset.columns.values()):
+                self._replace(os.path.join(cache_path, f'{index}.npy'), lambda f, array=array: np.save(f, array))
+            # 清单最后写入，保证清单存在时列文件已完整
+            manifest = json.dumps({
+                'source_mtime': dataset.source_mtime,
+                'source_size': dataset.source_size,
+                'columns': dataset.column_names
+            }, ensure_ascii=False).encode('utf-8')
+            self._replace(os.path.join(cache_path, 'manifest.json'), lambda f: f.write(manifest))
+        except OSError as e:
+            print(f"数据集缓存写入失败: {e}")
+            return
+
+        # 清理旧版本目录；已映射旧文件的进程仍可继续读取，文件在映射关闭后才真正释放
+        for entry in os.listdir(cache_root):
+            entry_path = os.path.join(cache_root, entry)
+            if entry_path == cache_path:
+                continue
+            if os.path.isdir(entry_path):
+                shutil.rmtree(entry_path, ignore_errors=True)
+            else:
+                # 旧版缓存布局直接写在数据集目录下的文件
+                try:
+                    os.remove(entry_path)
+                except OSError:
+                    pass
@@ -0,0 +1,124 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class ForecastCache:
+    """预测结果缓存（LRU + TTL）
+
+    以历史窗口数据字节、预测参数和模型标识的哈希作为键，缓存 generate 的采样结果。
+    同时限制条目数与总字节数，超限时按最近最少使用淘汰；某个模型重新加载（代数变化）
+    或被换出时，只失效该模型的条目。
+    """
+
+    def __init__(self, max_entries=512, ttl_seconds=600, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = float(ttl_seconds)
+        self.max_bytes = int(max_bytes)
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        # 模型名称 -> 当前加载代数
+        self._model_generations = {}
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def make_key(series, model_name, generation, **params):
+        """根据序列内容、预测参数与模型标识生成缓存键"""
+        digest = hashlib.sha256()
+        digest.update(f'{model_name}:{generation}'.encode('utf-8'))
+        digest.update(repr(sorted(params.items())).encode('utf-8'))
+        digest.update(np.ascontiguousarray(series, dtype=np.float32).tobytes())
+        return digest.hexdigest()
+
+    def bind_model(self, model_name, generation):
+        """登记模型的当前加载代数，代数变化时失效该模型的全部条目"""
+        with self._lock:
+            if self._model_generations.get(model_name, generation) != generation:
+                self._invalidate_model(model_name)
+            self._model_generations[model_name] = generation
+
+    def invalidate_model(self, model_name):
+        """失效指定模型的全部条目（如模型被换出时）"""
+        with self._lock:
+            self._invalidate_model(model_name)
+            self._model_generations.pop(model_name, None)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            value, expires_at, _ = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key, value, model_name=None):
+        value = np.array(value, dtype=np.float32)
+        value.flags.writeable = False
+        if value.nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + self.ttl, model_name)
+            self._bytes += value.nbytes
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._evictions += 1
+
+    def invalidate(self):
+        """清空全部缓存"""
+        with self._lock:
+            self._clear()
+            self._invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / total, 4) if total else 0,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations
+            }
+
+    def _remove(self, key):
+        value, _, _ = self._entries.pop(key)
+        self._bytes -= value.nbytes
+
+    def _invalidate_model(self, model_name):
+        stale = [key for key, (_, _, name) in self._entries.items() if name == model_name]
+        for key in stale:
+            self._remove(key)
+        if stale:
+            self._invalidations += 1
+
+    def _clear(self):
+        self._entries.clear()
+        self._bytes = 0
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import torch
+
+# 推理接口与 /model/predict、/model/evaluate 本地后端共用的无状态预测工具：
+# 输入解析、采样参数校验、分位数、回测窗口与误差指标。
+
+
+def finite_or_none(value):
+    """非有限值（NaN / inf）转换为 None，便于 JSON 序列化"""
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+def column_values(values):
+    """将列数组转换为 float32 数组并去除缺失值"""
+    if not isinstance(values, np.ndarray) or values.dtype.kind != 'f':
+        values = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float32)
+    values = values.astype(np.float32, copy=False)
+    return values[~np.isnan(values)]
+
+
+def parse_sampling(data, config):
+    """解析采样数与分位数参数，返回 (num_samples, quantiles, error)
+
+    num_samples 默认取 config 的 INFERENCE_NUM_SAMPLES，上限为 INFERENCE_MAX_NUM_SAMPLES。
+    """
+    max_samples = config.get('INFERENCE_MAX_NUM_SAMPLES', 100)
+    try:
+        num_samples = int(data.get('num_samples', config.get('INFERENCE_NUM_SAMPLES', 20)))
+        quantiles = [float(level) for level in data.get('quantiles') or []]
+    except (TypeError, ValueError):
+        return None, None, '采样参数无效'
+
+    if not 1 <= num_samples <= max_samples:
+        return None, None, f'num_samples 需在 1 到 {max_samples} 之间'
+    if any(not 0 <= level <= 1 for level in quantiles):
+        return None, None, '分位数需在 0 到 1 之间'
+    return num_samples, quantiles, None
+
+
+def sample_quantiles(forecasts, quantiles):
+    """对各目标的采样 [num_samples, forecast_length] 一次性计算分位数，返回 [目标数, 分位数个数, forecast_length]"""
+    samples = torch.from_numpy(np.stack(forecasts).astype(np.float32, copy=False))
+    levels = torch.tensor(quantiles, dtype=samples.dtype)
+    return torch.quantile(samples, levels, dim=1).permute(1, 0, 2).numpy()
+
+
+def backtest_segments(target_values, lookback, horizon, stride, start=0, windows=None):
+    """滚动起点窗口 [窗口数, lookback + horizon]，所有窗口都是原序列上的跨步视图，不复制数据"""
+    segments = np.lib.stride_tricks.sliding_window_view(target_values[start:], lookback + horizon)[::stride]
+    return segments[:windows] if windows is not None else segments
+
+
+def error_metrics(prediction, actual):
+    """向量化计算误差指标，输入形状均为 [窗口数, horizon]，返回 (逐窗口指标, 汇总指标)
+
+    MAPE 以百分比表示，真实值为 0 的点不参与计算。
+    """
+    error = prediction - actual
+    abs_error = np.abs(error)
+    ape = np.divide(abs_error, np.abs(actual), out=np.full_like(abs_error, np.nan), where=actual != 0) * 100
+    valid = ~np.isnan(ape)
+    counts = valid.sum(axis=1)
+    ape_sums = np.where(valid, ape, 0).sum(axis=1)
+
+    per_window = {
+        'mse': np.mean(error ** 2, axis=1),
+        'mae': np.mean(abs_error, axis=1),
+        'mape': np.divide(ape_sums, counts, out=np.full(len(actual), np.nan), where=counts > 0)
+    }
+    aggregate = {
+        'mse': finite_or_none(np.mean(error ** 2)),
+        'mae': finite_or_none(np.mean(abs_error)),
+        'mape': finite_or_none(ape_sums.sum() / counts.sum()) if counts.sum() else None
+    }
+    return per_window, aggregate
@@ -0,0 +1,80 @@
+import statistics
+import time
+
+import numpy as np
+import torch
+
+# 可选推理后端：
+# - eager：fp32 动态图（默认）
+# - int8：对 nn.Linear 做动态 int8 量化，CPU 上通常有最明显的加速
+# - compile：用 torch.compile 编译前向计算图，解码循环中每步复用编译结果
+BACKENDS = ('eager', 'int8', 'compile')
+
+
+def prepare_model(model, backend='eager'):
+    """按后端对已加载的模型做推理优化，返回优化后的模型"""
+    if backend not in BACKENDS:
+        raise ValueError(f'不支持的推理后端: {backend}，可选: {", ".join(BACKENDS)}')
+
+    model.eval()
+    if backend == 'int8':
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    if backend == 'compile':
+        model.forward = torch.compile(model.forward, dynamic=True)
+    return model
+
+
+def _timed_generate(model, inputs, forecast_length, num_samples, seed):
+    torch.manual_seed(seed)
+    started = time.perf_counter()
+    with torch.no_grad():
+        forecast = model.generate(inputs, max_new_tokens=forecast_length, num_samples=num_samples)
+    return forecast.float().mean(dim=1).numpy(), time.perf_counter() - started
+
+
+def compare_backends(loader, backends=BACKENDS, batch_size=4, lookback_length=512,
+                     forecast_length=96, num_samples=20, runs=3, seed=0, tolerance=0.05):
+    """比较各后端与 fp32 eager 的精度一致性和延迟
+
+    每个后端各自加载一份模型，用相同的输入和随机种子推理，
+    以 eager 的样本均值为基准计算最大绝对误差和相对 MAE，相对 MAE 不超过 tolerance 视为一致。
+    """
+    rng = np.random.default_rng(seed)
+    steps = np.arange(lookback_length, dtype=np.float32)
+    inputs = np.stack([
+        np.sin(steps / rng.uniform(8, 64)) * rng.uniform(1, 10) + rng.normal(0, 0.1, lookback_length)
+        for _ in range(batch_size)
+    ]).astype(np.float32)
+    inputs = torch.from_numpy(inputs)
+
+    reference = None
+    report = []
+    for backend in ('eager',) + tuple(b for b in backends if b != 'eager'):
+        entry = {'backend': backend}
+        try:
+            model = prepare_model(loader(), backend)
+            # 首次调用包含编译/量化初始化开销，单独计时
+            _, entry['first_call_seconds'] = _timed_generate(model, inputs, forecast_length, num_samples, seed)
+
+            latencies = []
+            for _ in range(runs):
+                prediction, seconds = _timed_generate(model, inputs, forecast_length, num_samples, seed)
+                latencies.append(seconds)
+            entry['median_seconds'] = statistics.median(latencies)
+
+            if reference is None:
+                reference = prediction
+                entry['speedup'] = 1.0
+            else:
+                entry['speedup'] = report[0]['median_seconds'] / entry['median_seconds']
+
+            diff = np.abs(prediction - reference)
+            entry['max_abs_error'] = float(diff.max())
+            entry['relative_mae'] = float(diff.mean() / max(float(np.abs(reference).mean()), 1e-8))
+            entry['parity'] = entry['relative_mae'] <= tolerance
+        except Exception as e:
+            if backend == 'eager':
+                raise
+            entry['error'] = str(e)
+        report.append(entry)
+    return report
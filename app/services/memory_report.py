@@ -0,0 +1,64 @@
+import os
+
+# smaps_rollup 中需要汇总的字段（单位 kB）
+_FIELDS = {
+    'Rss': 'rss_kb',
+    'Pss': 'pss_kb',
+    'Shared_Clean': 'shared_clean_kb',
+    'Shared_Dirty': 'shared_dirty_kb',
+    'Private_Clean': 'private_clean_kb',
+    'Private_Dirty': 'private_dirty_kb'
+}
+
+
+def process_memory(pid='self'):
+    """读取进程的内存页统计，区分与其他进程共享的页和进程独占的页（仅 Linux）"""
+    path = f'/proc/{pid}/smaps_rollup'
+    if not os.path.exists(path):
+        path = f'/proc/{pid}/smaps'
+
+    totals = dict.fromkeys(_FIELDS.values(), 0)
+    with open(path) as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            if key in _FIELDS:
+                totals[_FIELDS[key]] += int(value.split()[0])
+
+    totals['pid'] = os.getpid() if pid == 'self' else int(pid)
+    totals['shared_kb'] = totals['shared_clean_kb'] + totals['shared_dirty_kb']
+    totals['unique_kb'] = totals['private_clean_kb'] + totals['private_dirty_kb']
+    return totals
+
+
+def child_pids(pid):
+    """列出指定进程的直接子进程"""
+    children = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # 进程名可能含空格，父进程号位于最后一个 ')' 之后的第二个字段
+                fields = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == int(pid):
+            children.append(int(entry))
+    return sorted(children)
+
+
+def workers_memory(master_pid):
+    """汇总 master 及其全部 worker 的共享页 / 独占页统计"""
+    workers = []
+    for pid in child_pids(master_pid):
+        try:
+            workers.append(process_memory(pid))
+        except OSError:
+            continue
+
+    return {
+        'master': process_memory(master_pid),
+        'workers': workers,
+        'total_unique_kb': sum(worker['unique_kb'] for worker in workers),
+        'total_pss_kb': sum(worker['pss_kb'] for worker in workers)
+    }
@@ -0,0 +1,147 @@
+import threading
+import time
+
+
+class ModelManager:
+    """模型生命周期管理
+
+    通过锁保证模型只加载一次，加载后执行若干次预热推理，并对外报告状态：
+    idle（未加载）、loading（加载中）、warming（预热中）、ready（就绪）、failed（失败）。
+    请求可据此等待加载完成或快速失败，避免并发首个请求重复加载模型。
+    加载失败后 retry_after 秒内请求直接失败，之后的首个请求重新尝试加载（None 表示不再自动重试）。
+    """
+
+    IDLE = 'idle'
+    LOADING = 'loading'
+    WARMING = 'warming'
+    READY = 'ready'
+    FAILED = 'failed'
+
+    def __init__(self, loader, warmup=None, warmup_runs=2, name='model', retry_after=30.0, generations=None):
+        self._loader = loader
+        self._warmup = warmup
+        self.warmup_runs = warmup_runs
+        self.name = name
+        self.retry_after = retry_after
+        # 加载代数的来源（如 itertools.count），多个管理器共用时代数在它们之间单调递增
+        self._generations = generations
+
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread = None
+        self._attempts = 0
+
+        self.model = None
+        self.state = self.IDLE
+        self.error = None
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self.loaded_at = None
+        self.failed_at = None
+        # 每次成功加载递增，与 name 一起作为缓存中的模型标识，用于识别模型是否发生变化
+        self.generation = 0
+
+    def start(self, background=True):
+        """触发加载；background 为 True 时在后台线程中执行"""
+        if not background:
+            return self.load()
+        with self._lock:
+            if self.state != self.IDLE or (self._thread and self._thread.is_alive()):
+                return None
+            self._thread = threading.Thread(target=self.load, name=f'{self.name}-loader', daemon=True)
+            self._thread.start()
+        return None
+
+    def load(self):
+        """加锁加载并预热模型，已就绪或等待锁期间已有其他线程完成加载时直接返回"""
+        attempts = self._attempts
+        with self._lock:
+            if self.state == self.READY or self._attempts != attempts:
+                return self.model
+
+            self._done.clear()
+            self.state = self.LOADING
+            self.error = None
+            try:
+                started = time.perf_counter()
+                model = self._loader()
+                self.load_seconds = round(time.perf_counter() - started, 3)
+
+                self.state = self.WARMING
+                started = time.perf_counter()
+                if self._warmup is not None:
+                    for _ in range(self.warmup_runs):
+                        self._warmup(model)
+                self.warmup_seconds = round(time.perf_counter() - started, 3)
+
+                self.model = model
+                self.generation = next(self._generations) if self._generations is not None else self.generation + 1
+                self.loaded_at = time.time()
+                self.failed_at = None
+                self.state = self.READY
+                print(f"{self.name} 模型加载成功，耗时 {self.load_seconds}s，预热 {self.warmup_seconds}s")
+            except Exception as e:
+                self.model = None
+                self.error = str(e)
+                self.failed_at = time.time()
+                self.state = self.FAILED
+                print(f"{self.name} 模型加载失败: {e}")
+            finally:
+                self._attempts += 1
+                self._done.set()
+            return self.model
+
+    def warm(self, runs=None):
+        """对已就绪的模型补充执行预热（如 fork 后在各 worker 中执行）"""
+        if self.state != self.READY or self._warmup is None:
+            return
+        started = time.perf_counter()
+        for _ in range(self.warmup_runs if runs is None else runs):
+            self._warmup(self.model)
+        self.warmup_seconds = round(time.perf_counter() - started, 3)
+
+    def reload(self):
+        """丢弃当前模型并重新加载"""
+        with self._lock:
+            self.model = None
+            self.state = self.IDLE
+            self._attempts += 1
+        return self.load()
+
+    def get_model(self, wait=True, timeout=None):
+        """获取已就绪的模型
+
+        未加载时在当前线程加载；加载中时按 wait/timeout 等待；失败后未到重试间隔时立即返回 None，
+        到达间隔后在当前线程重新加载。
+        """
+        state = self.state
+        if state == self.READY:
+            return self.model
+        if state == self.FAILED:
+            if not self.retry_due():
+                return None
+            return self.load()
+        if state == self.IDLE and not (self._thread and self._thread.is_alive()):
+            return self.load()
+        if wait:
+            self._done.wait(timeout)
+        return self.model if self.state == self.READY else None
+
+    def retry_due(self):
+        """加载失败后是否已到达重试间隔"""
+        if self.state != self.FAILED or self.retry_after is None:
+            return False
+        return self.failed_at is None or time.time() - self.failed_at >= self.retry_after
+
+    def status(self):
+        """返回模型生命周期状态"""
+        return {
+            'name': self.name,
+            'state': self.state,
+            'error': self.error,
+            'generation': self.generation,
+            'load_seconds': self.load_seconds,
+            'warmup_seconds': self.warmup_seconds,
+            'loaded_at': self.loaded_at,
+            'failed_at': self.failed_at
+        }
@@ -0,0 +1,147 @@
+import itertools
+import threading
+from collections import OrderedDict
+
+from .model_manager import ModelManager
+
+
+class ModelRegistry:
+    """本地多模型注册表
+
+    将模型版本（ModelVersion.version_id）映射到磁盘检查点，每个版本由独立的 ModelManager
+    负责加载与预热。最多同时常驻 max_resident 个版本，且常驻模型的权重总字节数不超过
+    memory_budget_bytes，超出时按最近最少使用顺序换出。
+
+    acquire 返回的管理器在对应的 release 之前计为使用中，使用中的版本不会被换出；
+    全部常驻版本都在使用时可暂时超出限制，待使用者释放后再换出。
+    """
+
+    def __init__(self, loader, warmup=None, sizeof=None, max_resident=2, memory_budget_bytes=None,
+                 on_evict=None, retry_after=30.0):
+        # loader(checkpoint_path) -> model
+        self._loader = loader
+        self._warmup = warmup
+        self._sizeof = sizeof or (lambda model: 0)
+        self.max_resident = max(1, int(max_resident))
+        self.memory_budget_bytes = memory_budget_bytes
+        self._on_evict = on_evict
+        # 各版本加载失败后的重试间隔（秒）
+        self.retry_after = retry_after
+
+        self._managers = OrderedDict()
+        self._paths = {}
+        self._sizes = {}
+        # 管理器 -> 未释放的 acquire 次数
+        self._refs = {}
+        # 全部版本共用的加载代数：检查点变更后新建的同名管理器代数不会与旧管理器重复，
+        # 仍在使用旧管理器的请求写入的缓存条目不会被新检查点命中
+        self._generations = itertools.count(1)
+        self._lock = threading.Lock()
+
+        self._loads = 0
+        self._evictions = 0
+
+    def acquire(self, version_id, checkpoint_path, wait=True, timeout=None):
+        """获取指定版本的模型管理器并确保模型已加载，必要时换出其他未使用的版本
+
+        无论加载是否成功，调用方都须在使用结束后调用 release(manager)。
+        """
+        with self._lock:
+            manager = self._managers.get(version_id)
+            if manager is not None and self._paths.get(version_id) != checkpoint_path:
+                # 检查点路径变更时先换出旧模型，使其缓存条目一并失效
+                self._remove(version_id)
+                manager = None
+            if manager is None:
+                manager = ModelManager(
+                    lambda: self._loader(checkpoint_path),
+                    warmup=self._warmup,
+                    name=f'version-{version_id}',
+                    retry_after=self.retry_after,
+                    generations=self._generations
+                )
+                self._managers[version_id] = manager
+                self._paths[version_id] = checkpoint_path
+            self._managers.move_to_end(version_id)
+            self._refs[manager] = self._refs.get(manager, 0) + 1
+
+        model = manager.get_model(wait=wait, timeout=timeout)
+        if model is not None:
+            with self._lock:
+                if self._managers.get(version_id) is manager:
+                    if version_id not in self._sizes:
+                        self._loads += 1
+                    self._sizes[version_id] = self._sizeof(model)
+                    self._evict()
+        return manager
+
+    def release(self, manager):
+        """结束对 acquire 返回的管理器的使用；超出限制时换出已无人使用的版本"""
+        with self._lock:
+            count = self._refs.get(manager, 0) - 1
+            if count > 0:
+                self._refs[manager] = count
+                return
+            self._refs.pop(manager, None)
+            if any(registered is manager for registered in self._managers.values()):
+                self._evict()
+            else:
+                # 使用期间已被移出注册表（换出或检查点变更），最后一个使用者释放后再卸载
+                self._unload(manager)
+
+    def get(self, version_id):
+        """返回常驻的模型管理器，未注册或已换出时返回 None"""
+        with self._lock:
+            return self._managers.get(version_id)
+
+    def evict(self, version_id):
+        with self._lock:
+            self._remove(version_id)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_resident': self.max_resident,
+                'memory_budget_bytes': self.memory_budget_bytes,
+                'resident_bytes': sum(self._sizes.values()),
+                'loads': self._loads,
+                'evictions': self._evictions,
+                'models': [{
+                    'version_id': version_id,
+                    'checkpoint_path': self._paths.get(version_id),
+                    'bytes': self._sizes.get(version_id),
+                    'state': manager.state,
+                    'in_use': self._refs.get(manager, 0)
+                } for version_id, manager in self._managers.items()]
+            }
+
+    def _over_budget(self):
+        if len(self._managers) > self.max_resident:
+            return True
+        return self.memory_budget_bytes is not None and sum(self._sizes.values()) > self.memory_budget_bytes
+
+    def _evict(self):
+        # 从最久未使用的版本开始换出，跳过仍有请求或批次在使用的版本
+        for version_id, manager in list(self._managers.items()):
+            if not self._over_budget():
+                break
+            if self._refs.get(manager):
+                continue
+            self._remove(version_id)
+            self._evictions += 1
+
+    def _remove(self, version_id):
+        manager = self._managers.pop(version_id, None)
+        self._paths.pop(version_id, None)
+        self._sizes.pop(version_id, None)
+        if manager is None:
+            return
+        # 缓存条目立即失效，避免同名的新管理器命中旧检查点的预测；模型对象在无人使用后才卸载
+        if self._on_evict is not None:
+            self._on_evict(manager)
+        if not self._refs.get(manager):
+            self._unload(manager)
+
+    def _unload(self, manager):
+        manager.model = None
+        manager.state = ModelManager.IDLE
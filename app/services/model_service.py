@@ -0,0 +1,184 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class ModelServiceError(Exception):
+    """模型服务不可用：熔断打开、并发已满或网络错误"""
+
+
+class CircuitBreaker:
+    """连续失败达到阈值后熔断，reset_timeout 秒内直接拒绝请求；到期后放行一个探测请求（半开），
+    探测成功则恢复，失败则重新熔断"""
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = float(reset_timeout)
+
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._opens = 0
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._probing:
+                    self._opens += 1
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                state = 'closed'
+            elif self._probing or time.monotonic() - self._opened_at >= self.reset_timeout:
+                state = 'half_open'
+            else:
+                state = 'open'
+            return {
+                'state': state,
+                'consecutive_failures': self._failures,
+                'opens': self._opens
+            }
+
+
+class _OperationStats:
+    """单个远程操作的调用次数、错误数与最近若干次调用的延迟"""
+
+    def __init__(self, window=512):
+        self.calls = 0
+        self.errors = 0
+        self.rejected = 0
+        self.latencies = deque(maxlen=window)
+
+    def snapshot(self):
+        latencies = np.array(self.latencies) * 1000 if self.latencies else None
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'rejected': self.rejected,
+            'error_rate': round(self.errors / self.calls, 4) if self.calls else 0.0,
+            'avg_ms': round(float(latencies.mean()), 2) if latencies is not None else None,
+            'p50_ms': round(float(np.percentile(latencies, 50)), 2) if latencies is not None else None,
+            'p95_ms': round(float(np.percentile(latencies, 95)), 2) if latencies is not None else None
+        }
+
+
+class ModelServiceClient:
+    """模型服务的共享 HTTP 客户端
+
+    - 复用 Session 与连接池（keep-alive），避免每次调用新建 TCP 连接；
+    - 每类操作单独的读超时（timeouts，未配置的操作使用 default_timeout），连接超时统一为 connect_timeout；
+    - 以信号量限制同时进行的远程调用数，等待超过 acquire_timeout 秒直接失败，慢服务不会占满全部 worker；
+    - 网络错误、超时与 5xx 计入熔断器，熔断期间直接失败；
+    - 按操作统计调用次数、错误数与延迟。
+    """
+
+    def __init__(self, base_url, timeouts=None, default_timeout=30.0, connect_timeout=3.0,
+                 max_concurrency=16, acquire_timeout=5.0, failure_threshold=5, reset_timeout=30.0):
+        self.base_url = base_url.rstrip('/')
+        self.timeouts = {name: float(value) for name, value in (timeouts or {}).items()}
+        self.default_timeout = float(default_timeout)
+        self.connect_timeout = float(connect_timeout)
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.acquire_timeout = float(acquire_timeout)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        self._stats_lock = threading.Lock()
+        self._stats = {}
+        self._in_flight = 0
+
+    def timeout(self, operation):
+        return self.connect_timeout, self.timeouts.get(operation, self.default_timeout)
+
+    def _record(self, operation, elapsed=None, error=False, rejected=False):
+        with self._stats_lock:
+            stats = self._stats.setdefault(operation, _OperationStats())
+            if rejected:
+                stats.rejected += 1
+                return
+            stats.calls += 1
+            stats.latencies.append(elapsed)
+            if error:
+                stats.errors += 1
+
+    def request(self, operation, method, path, **kwargs):
+        """调用模型服务，返回 requests.Response；服务不可用时抛出 ModelServiceError"""
+        # 先取得并发名额再询问熔断器，保证半开状态放行的探测请求一定会发出
+        if not self._semaphore.acquire(timeout=self.acquire_timeout):
+            self._record(operation, rejected=True)
+            raise ModelServiceError('模型服务并发请求已满，请稍后重试')
+
+        if not self.breaker.allow():
+            self._semaphore.release()
+            self._record(operation, rejected=True)
+            raise ModelServiceError('模型服务暂不可用（熔断中），请稍后重试')
+
+        with self._stats_lock:
+            self._in_flight += 1
+        started = time.perf_counter()
+        try:
+            response = self.session.request(
+                method, f'{self.base_url}{path}', timeout=self.timeout(operation), **kwargs
+            )
+        except requests.RequestException as e:
+            self.breaker.record_failure()
+            self._record(operation, time.perf_counter() - started, error=True)
+            raise ModelServiceError(f'模型服务请求失败: {e}') from e
+        finally:
+            with self._stats_lock:
+                self._in_flight -= 1
+            self._semaphore.release()
+
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        self._record(operation, time.perf_counter() - started, error=response.status_code != 200)
+        return response
+
+    def get(self, operation, path, **kwargs):
+        return self.request(operation, 'GET', path, **kwargs)
+
+    def post(self, operation, path, **kwargs):
+        return self.request(operation, 'POST', path, **kwargs)
+
+    def stats(self):
+        with self._stats_lock:
+            operations = {name: stats.snapshot() for name, stats in self._stats.items()}
+            in_flight = self._in_flight
+        return {
+            'base_url': self.base_url,
+            'max_concurrency': self.max_concurrency,
+            'in_flight': in_flight,
+            'circuit': self.breaker.state(),
+            'operations': operations
+        }
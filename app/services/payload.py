@@ -0,0 +1,163 @@
+import csv
+import io
+import json
+from array import array
+
+import numpy as np
+
+try:
+    import ijson
+except ImportError:  # ijson 为可选依赖，未安装时回退为整体解析 JSON
+    ijson = None
+
+_SCALAR_EVENTS = ('number', 'string', 'boolean', 'null')
+
+
+def streaming_available():
+    return ijson is not None
+
+
+def _to_float(value):
+    """与 pd.to_numeric(errors='coerce') 一致：无法转换的值记为 NaN"""
+    if isinstance(value, bool) or value is None:
+        return float('nan')
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+class _ColumnCollector:
+    """按列累积数值，只保留 keep 中的列（keep 为 None 时保留全部列），每列存为 float32"""
+
+    def __init__(self, keep=None):
+        self.keep = set(keep) if keep is not None else None
+        self.columns = {}
+
+    def append(self, column, value):
+        if self.keep is not None and column not in self.keep:
+            return
+        values = self.columns.get(column)
+        if values is None:
+            values = self.columns[column] = array('f')
+        values.append(_to_float(value))
+
+    def result(self):
+        return {column: np.frombuffer(values, dtype=np.float32) for column, values in self.columns.items()}
+
+
+class _Reader:
+    """ijson 会先以 read(0) 探测流类型，部分 WSGI 输入流把读到 0 字节视为客户端断开，这里直接返回空字节"""
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def read(self, size=-1):
+        return self._stream.read(size) if size else b''
+
+
+def parse_json_payload(stream, keep=None, data_key='data'):
+    """增量解析 JSON 请求体
+
+    data_key 之外的顶层字段按原样构建为参数；data_key 对应的行记录列表 [{列: 值}] 或列数组
+    {列: [值]} 不整体物化，而是边解析边把数值追加到各列的 float32 数组中，返回的 data 为
+    {列名: float32 数组}。keep 指定需要保留的列；未指定时按 target_variable / column / targets
+    字段确定：这些字段在 data 之前出现时解析过程中即丢弃其他列，在 data 之后出现时先按列累积全部
+    数值（每个值 4 字节），解析结束后再只保留目标列。
+    """
+    params = {}
+    # data 开始时尚不知道目标列，解析结束后再投影
+    deferred = False
+    collector = None
+    key = None
+    builder = None
+    depth = 0
+    column = None
+
+    for prefix, event, value in ijson.parse(_Reader(stream), use_float=True):
+        if builder is not None:
+            # 构建 data 以外的顶层字段值
+            builder.event(event, value)
+            if event in ('start_map', 'start_array'):
+                depth += 1
+            elif event in ('end_map', 'end_array'):
+                depth -= 1
+            if depth == 0:
+                params[key] = builder.value
+                builder = None
+            continue
+
+        if collector is not None:
+            # data 内：深度 1 为列表或列映射，深度 2 为行记录或列数组，深度 2 上的标量即一个数值
+            if event in ('start_map', 'start_array'):
+                depth += 1
+            elif event in ('end_map', 'end_array'):
+                depth -= 1
+                if depth == 0:
+                    params[data_key] = collector.result()
+                    collector = None
+            elif event == 'map_key':
+                if depth == 1 or depth == 2:
+                    column = value
+            elif depth == 2 and event in _SCALAR_EVENTS and column is not None:
+                collector.append(column, value)
+            continue
+
+        if prefix == '' and event == 'map_key':
+            key = value
+        elif prefix == key and key == data_key and event in ('start_map', 'start_array'):
+            columns = keep if keep is not None else columns_from_params(params)
+            deferred = columns is None and keep is None
+            collector = _ColumnCollector(columns)
+            depth = 1
+            column = None
+        elif prefix == key and event in _SCALAR_EVENTS:
+            params[key] = value
+        elif prefix == key and event in ('start_map', 'start_array'):
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+            depth = 1
+
+    columns = columns_from_params(params) if deferred else None
+    if columns is not None and isinstance(params.get(data_key), dict):
+        params[data_key] = {name: values for name, values in params[data_key].items() if name in columns}
+    return params
+
+
+def parse_csv_payload(stream, keep=None, encoding='utf-8-sig'):
+    """逐行解析 CSV 请求体，返回 {列名: float32 数组}，keep 指定需要保留的列"""
+    reader = csv.reader(io.TextIOWrapper(stream, encoding=encoding, newline=''))
+    header = next(reader, None)
+    if not header:
+        return {}
+
+    collector = _ColumnCollector(keep)
+    indexes = [(index, name) for index, name in enumerate(header) if keep is None or name in keep]
+    for row in reader:
+        for index, name in indexes:
+            if index < len(row):
+                collector.append(name, row[index])
+    return collector.result()
+
+
+def columns_from_params(params):
+    """根据 targets / column / target_variable 参数确定需要保留的列，None 表示全部列"""
+    targets = params.get('targets')
+    if isinstance(targets, list):
+        return targets
+    if targets == 'all':
+        return None
+    target = params.get('column') or params.get('target_variable')
+    return [target] if target else None
+
+
+def query_params(args):
+    """把查询参数按 JSON 字面量解析（如 forecast_length=96、quantiles=[0.1,0.9]），无法解析的保留为字符串"""
+    params = {}
+    for name, value in args.items():
+        try:
+            params[name] = json.loads(value)
+        except ValueError:
+            params[name] = value
+    return params
+
@@ -0,0 +1,98 @@
+import os
+import threading
+
+import torch
+
+
+def available_cores():
+    """当前进程可用的 CPU 核心编号（已受 cgroup / taskset 限制时只返回允许的核心）"""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+class ResourceManager:
+    """推理 worker 的 CPU 资源分配
+
+    多个 worker 同机部署时，每个 torch 实例默认占满全部核心做算子内并行，相互争抢导致负载下
+    延迟远高于单请求延迟。这里按 worker 数把可用核心均分为各 worker 的线程预算，可选地把
+    worker 绑定到各自的核心区间，并在模型加载前设置 torch 的算子内 / 算子间线程数。
+    """
+
+    def __init__(self):
+        # 在任何核心绑定之前记录全部可用核心，fork 出的 worker 继承该列表
+        self._cores = available_cores()
+        self.workers = 1
+        self.worker_index = 0
+        self.threads = None
+        self.interop_threads = 1
+        self.pin_cores = False
+
+        self._lock = threading.Lock()
+        self._applied = None
+        self._errors = []
+
+    def configure(self, workers=1, worker_index=0, threads=None, interop_threads=1, pin_cores=False):
+        """设置 worker 总数、当前 worker 序号与线程预算；threads 为空时按可用核心数 / worker 数自动计算"""
+        self.workers = max(1, int(workers))
+        self.worker_index = int(worker_index) % self.workers
+        self.threads = int(threads) if threads else None
+        self.interop_threads = max(1, int(interop_threads))
+        self.pin_cores = bool(pin_cores)
+
+    def assign(self, worker_index):
+        """指定当前进程的 worker 序号（如 gunicorn post_fork 中），并重新应用分配"""
+        self.worker_index = int(worker_index) % self.workers
+        with self._lock:
+            self._applied = None
+        return self.apply()
+
+    def plan(self):
+        """计算当前 worker 的线程数与绑定核心"""
+        cores = self._cores
+        budget = self.threads or max(1, len(cores) // self.workers)
+        start = (self.worker_index * budget) % len(cores)
+        worker_cores = [cores[(start + offset) % len(cores)] for offset in range(min(budget, len(cores)))]
+        return {
+            'workers': self.workers,
+            'worker_index': self.worker_index,
+            'intra_op_threads': budget,
+            'inter_op_threads': self.interop_threads,
+            'cores': sorted(worker_cores) if self.pin_cores else None
+        }
+
+    def apply(self):
+        """应用线程预算与核心绑定，同一进程内只执行一次；返回实际生效的配置"""
+        with self._lock:
+            if self._applied is not None:
+                return self._applied
+
+            plan = self.plan()
+            self._errors = []
+            if plan['cores'] and hasattr(os, 'sched_setaffinity'):
+                try:
+                    os.sched_setaffinity(0, plan['cores'])
+                except OSError as e:
+                    self._errors.append(f'绑定核心失败: {e}')
+
+            torch.set_num_threads(plan['intra_op_threads'])
+            if torch.get_num_interop_threads() != plan['inter_op_threads']:
+                try:
+                    torch.set_num_interop_threads(plan['inter_op_threads'])
+                except RuntimeError as e:
+                    # 算子间线程数在进程内只能设置一次，且须在首次并行计算之前
+                    self._errors.append(f'设置算子间线程数失败: {e}')
+
+            self._applied = plan
+            return plan
+
+    def info(self):
+        """返回计划分配与 torch 实际生效的线程配置"""
+        return {
+            **(self._applied or self.plan()),
+            'applied': self._applied is not None,
+            'available_cores': len(self._cores),
+            'torch_num_threads': torch.get_num_threads(),
+            'torch_num_interop_threads': torch.get_num_interop_threads(),
+            'errors': list(self._errors)
+        }
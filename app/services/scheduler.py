@@ -0,0 +1,101 @@
+import threading
+import time
+from datetime import datetime
+
+import click
+from apscheduler.schedulers.background import BackgroundScheduler
+
+# 进程内共享的后台调度器：各后台作业（批量预测、任务分发、状态同步）在创建应用时通过 schedule_job 登记，
+# 作业函数在应用上下文中执行。登记不会启动调度器，只有指定的一个进程调用 start() 后作业才会运行：
+# - gunicorn：序号为 0 的 worker（见 gunicorn.conf.py 的 post_worker_init）；
+# - 开发服务器（python run.py）：reloader 子进程；
+# - 独立进程：flask --app run scheduler。
+# 其他 worker、flask 命令行与 reloader 父进程只登记作业，不会重复执行。
+_scheduler = None
+_lock = threading.Lock()
+
+
+def get_scheduler():
+    global _scheduler
+    if _scheduler is None:
+        with _lock:
+            if _scheduler is None:
+                _scheduler = BackgroundScheduler(daemon=True, job_defaults={
+                    'coalesce': True,
+                    'max_instances': 1,
+                    'misfire_grace_time': 60
+                })
+    return _scheduler
+
+
+def schedule_job(app, job_id, func, seconds, enabled=None, **kwargs):
+    """按固定间隔（秒）调度作业；enabled 为 None 时取 SCHEDULER_ENABLED，未开启或间隔不大于 0 时不注册，返回 False"""
+    if enabled is None:
+        enabled = app.config.get('SCHEDULER_ENABLED')
+    if not enabled or seconds <= 0:
+        return False
+
+    def run():
+        with app.app_context():
+            func(**kwargs)
+
+    get_scheduler().add_job(run, 'interval', seconds=seconds, id=job_id, replace_existing=True)
+    return True
+
+
+def start():
+    """在当前进程中启动已登记作业的调度器，没有已登记作业时返回 False"""
+    scheduler = get_scheduler()
+    with _lock:
+        if not scheduler.get_jobs():
+            return False
+        if not scheduler.running:
+            scheduler.start()
+    return True
+
+
+def run_forever():
+    """在前台运行调度器直到进程被中断（独立的后台作业进程）"""
+    if not start():
+        return False
+    try:
+        while True:
+            time.sleep(60)
+    except (KeyboardInterrupt, SystemExit):
+        get_scheduler().shutdown()
+    return True
+
+
+@click.command('scheduler')
+def scheduler_command():
+    """在当前进程中运行已登记的后台作业（定时批量预测、任务分发与状态同步）"""
+    if not run_forever():
+        click.echo('没有已开启的后台作业')
+
+
+def running():
+    return _scheduler is not None and _scheduler.running
+
+
+def run_now(job_id):
+    """让已注册的作业立即执行一次（不改变其后的执行间隔）；作业未注册或本进程未运行调度器时返回 False"""
+    job = _scheduler.get_job(job_id) if running() else None
+    if job is None:
+        return False
+    job.modify(next_run_time=datetime.now(job.trigger.timezone))
+    return True
+
+
+def jobs():
+    """返回已注册作业及下次执行时间；本进程未运行调度器时下次执行时间为 None"""
+    if _scheduler is None:
+        return []
+    result = []
+    for job in _scheduler.get_jobs():
+        # 调度器启动前登记的作业尚未计算下次执行时间
+        next_run_time = getattr(job, 'next_run_time', None)
+        result.append({
+            'id': job.id,
+            'next_run_time': next_run_time.strftime('%Y-%m-%d %H:%M:%S') if next_run_time else None
+        })
+    return result
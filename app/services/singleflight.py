@@ -0,0 +1,56 @@
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """合并并发的相同计算
+
+    同一键的计算进行中时，后到的请求不再重复计算，而是等待首个请求（leader）的 Future，
+    由 leader 通过 resolve 将结果或异常分发给所有等待者。
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+        self._leaders = 0
+        self._coalesced = 0
+
+    def claim(self, key):
+        """登记对 key 的计算，返回 (future, is_leader)；is_leader 为 False 时只需等待 future"""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self._coalesced += 1
+                return future, False
+
+            future = Future()
+            self._inflight[key] = future
+            self._leaders += 1
+            return future, True
+
+    def resolve(self, key, value=None, error=None, future=None):
+        """结束 key 的计算并唤醒等待者，error 不为 None 时向等待者抛出该异常
+
+        传入 future（claim 返回的 Future）时只结束这一次计算：key 已结束、又被新的 leader 登记时不做任何事。
+        """
+        with self._lock:
+            current = self._inflight.get(key)
+            if current is None or (future is not None and current is not future):
+                return
+            del self._inflight[key]
+        future = current
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+
+    def stats(self):
+        with self._lock:
+            total = self._leaders + self._coalesced
+            return {
+                'in_flight': len(self._inflight),
+                'leaders': self._leaders,
+                'coalesced': self._coalesced,
+                'coalesced_rate': round(self._coalesced / total, 4) if total else 0.0
+            }
@@ -0,0 +1,36 @@
+import json
+
+import numpy as np
+import torch
+
+
+def sse_event(event, data):
+    """编码一条 Server-Sent Events 消息"""
+    return f'event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n'
+
+
+def decode_in_chunks(model, history, forecast_length, chunk_size=32, num_samples=20):
+    """分块自回归解码，每生成 chunk_size 步产出一次 (offset, samples)，samples 形状 [num_samples, chunk]
+
+    首块对历史序列采样 num_samples 条轨迹；后续各块把每条轨迹已生成的部分接到其上下文末尾，
+    以批量 [num_samples, L] 各取一条样本继续解码，保持各轨迹相互独立。上下文始终截取为
+    原历史长度，使每块的计算量与一次完整解码中的同长度片段相当。
+    """
+    chunk_size = max(1, int(chunk_size))
+    history = np.asarray(history, dtype=np.float32)
+    lookback_length = len(history)
+    context = torch.from_numpy(history).unsqueeze(0)
+
+    offset = 0
+    with torch.no_grad():
+        while offset < forecast_length:
+            steps = min(chunk_size, forecast_length - offset)
+            if offset == 0:
+                samples = model.generate(context, max_new_tokens=steps, num_samples=num_samples)[0]
+                context = context.repeat(num_samples, 1)
+            else:
+                samples = model.generate(context, max_new_tokens=steps, num_samples=1)[:, 0]
+            samples = samples[:, -steps:]
+            context = torch.cat([context, samples.to(context.dtype)], dim=1)[:, -lookback_length:]
+            yield offset, samples.numpy()
+            offset += steps
@@ -0,0 +1,44 @@
+import hashlib
+import time
+
+import torch
+
+
+class StubForecaster:
+    """与 Predenergy 的 generate 签名一致的确定性替身模型，用于无检查点环境下的基准测试与联调
+
+    预测值为历史末段的季节性朴素外推叠加噪声，噪声种子由输入内容决定，相同输入总是得到相同输出。
+    step_ms 模拟每个解码步的耗时（与批大小无关，近似真实模型按步解码的批处理收益）。
+    """
+
+    def __init__(self, step_ms=0.0, season=24, noise=0.05):
+        self.step_ms = float(step_ms)
+        self.season = int(season)
+        self.noise = float(noise)
+
+    def eval(self):
+        return self
+
+    def parameters(self):
+        return iter(())
+
+    def buffers(self):
+        return iter(())
+
+    def generate(self, inputs, max_new_tokens, num_samples=20, **kwargs):
+        """inputs [B, L] -> [B, num_samples, max_new_tokens]"""
+        if self.step_ms > 0:
+            time.sleep(self.step_ms * max_new_tokens / 1000.0)
+
+        inputs = inputs.to(torch.float32)
+        batch_size, length = inputs.shape
+        season = max(1, min(self.season, length))
+        pattern = inputs[:, -season:]
+        repeats = -(-max_new_tokens // season)
+        point = pattern.repeat(1, repeats)[:, :max_new_tokens]
+
+        seed = int.from_bytes(hashlib.sha256(inputs.numpy().tobytes()).digest()[:8], 'little')
+        generator = torch.Generator().manual_seed(seed + num_samples)
+        scale = inputs.std(dim=1, keepdim=True).clamp_min(1e-6).unsqueeze(1) * self.noise
+        noise = torch.randn(batch_size, num_samples, max_new_tokens, generator=generator) * scale
+        return point.unsqueeze(1) + noise
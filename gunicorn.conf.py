@@ -0,0 +1,66 @@
+import gc
+import json
+import os
+
+# gunicorn 配置，启动方式: gunicorn -c gunicorn.conf.py
+#
+# INFERENCE_SHARED_MODEL=true（默认）时开启 preload_app：master 进程在 fork 前加载一次 Predenergy，
+# 各 worker 通过写时复制共享只读的权重页，而不是每个 worker 各自加载一份。
+# 可通过 GET /api/inference/memory?scope=workers 查看各 worker 的共享页 / 独占页统计。
+#
+# 后台作业（定时批量预测、任务分发与状态同步）只在序号为 0 的 worker 中运行；
+# 设置 GUNICORN_SCHEDULER=false 时所有 worker 都不运行，改由独立进程 flask --app run scheduler 执行。
+
+shared_model = (os.environ.get('INFERENCE_SHARED_MODEL') or 'true').lower() == 'true'
+run_scheduler = (os.environ.get('GUNICORN_SCHEDULER') or 'true').lower() == 'true'
+
+wsgi_app = 'run:app'
+bind = os.environ.get('GUNICORN_BIND') or '0.0.0.0:8080'
+workers = int(os.environ.get('WEB_CONCURRENCY') or 2)
+threads = int(os.environ.get('GUNICORN_THREADS') or 4)
+timeout = int(os.environ.get('GUNICORN_TIMEOUT') or 120)
+preload_app = shared_model
+
+# 推理线程预算按 worker 数均分可用核心（见 app/services/resources.py）
+os.environ.setdefault('INFERENCE_WORKERS', str(workers))
+
+if shared_model:
+    os.environ['INFERENCE_SHARED_MODEL'] = 'true'
+    # master 中同步加载模型；预热推理会启动 torch 线程池，放到 fork 之后的 worker 中执行
+    os.environ['INFERENCE_MODEL_PRELOAD'] = 'eager'
+    os.environ['INFERENCE_MODEL_WARMUP_RUNS'] = '0'
+
+
+def pre_fork(server, worker):
+    # 冻结 master 中已有的对象，避免 worker 中的垃圾回收写入对象头导致共享页被复制
+    gc.freeze()
+
+    # 为新 worker 分配未被存活 worker 占用的最小序号，worker 重启后沿用空出的核心区间
+    used = {getattr(w, 'inference_slot', None) for w in server.WORKERS.values()}
+    worker.inference_slot = next(slot for slot in range(len(used) + 1) if slot not in used)
+
+
+def post_fork(server, worker):
+    os.environ['INFERENCE_WORKER_INDEX'] = str(worker.inference_slot)
+    if shared_model:
+        # 应用已在 master 中创建，按本 worker 的序号重新设置线程数与核心绑定
+        from app.api.inference import resource_manager
+        plan = resource_manager.assign(worker.inference_slot)
+        worker.log.info('inference worker resources: %s', json.dumps(plan))
+
+
+def post_worker_init(worker):
+    # worker 重启后沿用空出的序号，任何时刻只有一个 worker 的序号为 0
+    if run_scheduler and worker.inference_slot == 0:
+        from app.services import scheduler
+        if scheduler.start():
+            worker.log.info('background jobs running in worker %s', worker.pid)
+
+    if not shared_model:
+        return
+
+    from app.api.inference import model_manager
+    from app.services.memory_report import process_memory
+
+    model_manager.warm(int(os.environ.get('INFERENCE_WORKER_WARMUP_RUNS') or 2))
+    worker.log.info('inference worker memory: %s', json.dumps(process_memory()))
@@ -22,4 +22,8 @@ if __name__ == '__main__':
     for rule in app.url_map.iter_rules():
         print(f"  {rule.rule} -> {rule.endpoint}")
     print("\nServer will be available at: http://localhost:5000")
+    # 调试模式下由 reloader 子进程提供服务，后台作业只在该进程中运行
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        from app.services import scheduler
+        scheduler.start()
     app.run(host='0.0.0.0', port=8080, debug=True)
\ No newline at end of file
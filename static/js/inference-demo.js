@@ -1,5 +1,6 @@
 // 全局变量
 let currentData = null;
+let currentDatasetName = null;  // 当前使用的服务端示例数据集，上传文件时为 null
 let currentPage = 1;
 let rowsPerPage = 10;
 let trendChart = null;
@@ -71,6 +72,7 @@ function handleFile(file) {
                     return;
                 }
                 currentData = results.data;
+                currentDatasetName = null;
                 showStep2();
             }
         });
@@ -85,6 +87,7 @@ function loadSampleData(datasetName) {
         .then(data => {
             if (data.success) {
                 currentData = data.data;
+                currentDatasetName = datasetName;
                 showStep2();
             } else {
                 alert('加载示例数据失败：' + data.message);
@@ -415,16 +418,56 @@ function startPrediction() {
     document.getElementById('predictionChartContainer').style.display = 'block';
     document.getElementById('predictionLoading').style.display = 'flex';
 
-    // 准备预测数据
+    // 准备预测数据：示例数据集只传引用，由服务端读取序列，避免回传整个数据集
     const predictionData = {
-        data: currentData,
         target_variable: targetVariable,
         start_position: startPosition,
         mid_position: midPosition,
         forecast_length: forecastLength
     };
+    if (currentDatasetName) {
+        predictionData.dataset = currentDatasetName;
+    } else {
+        predictionData.data = currentData;
+    }
+
+    // 默认以流式预测逐块推送、增量绘制；页面提供的流式开关（#streamPrediction）取消勾选或浏览器不支持
+    // 读取响应流时，改为一次性请求完整预测
+    const streamToggle = document.getElementById('streamPrediction');
+    const canStream = typeof ReadableStream !== 'undefined' && typeof TextDecoder !== 'undefined';
+    if (!canStream || (streamToggle && !streamToggle.checked)) {
+        requestPrediction(predictionData);
+        return;
+    }
+
+    fetch('/api/inference/predict/stream', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'Accept': 'text/event-stream'
+        },
+        body: JSON.stringify(predictionData)
+    })
+    .then(response => {
+        const contentType = response.headers.get('Content-Type') || '';
+        if (!contentType.startsWith('text/event-stream')) {
+            // 参数错误或模型不可用时服务端直接返回 JSON
+            return response.json().then(data => {
+                document.getElementById('predictionLoading').style.display = 'none';
+                alert('预测失败：' + data.message);
+            });
+        }
+        return readPredictionStream(response);
+    })
+    .catch(error => {
+        document.getElementById('predictionLoading').style.display = 'none';
+        console.error('Error:', error);
+        alert('预测请求失败');
+    });
+}
 
-    // 发送预测请求
+// 发送预测请求，返回完整预测后绘制图表
+function requestPrediction(predictionData) {
     fetch('/api/inference/predict', {
         method: 'POST',
         headers: {
@@ -449,8 +492,73 @@ function startPrediction() {
     });
 }
 
+// 读取 Server-Sent Events 流并增量更新预测图表
+function readPredictionStream(response) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let result = null;
+
+    function handleEvent(event, data) {
+        if (event === 'meta') {
+            result = {...data, prediction: []};
+            document.getElementById('predictionLoading').style.display = 'none';
+            drawPredictionChart(result);
+        } else if (event === 'chunk') {
+            result.prediction.push(...data.prediction);
+            predictionChart.update('none');
+        } else if (event === 'done') {
+            result.prediction = data.prediction;
+            predictionChart.data.datasets[1].data = result.prediction;
+            predictionChart.update('none');
+            displayPredictionStats(result);
+            document.getElementById('predictionResults').style.display = 'block';
+        } else if (event === 'error') {
+            alert(data.message);
+        }
+    }
+
+    function pump() {
+        return reader.read().then(({done, value}) => {
+            buffer += decoder.decode(value || new Uint8Array(), {stream: !done});
+            // 事件之间以空行分隔，最后一段可能不完整，留待下次读取
+            const messages = buffer.split('\n\n');
+            buffer = messages.pop();
+            messages.forEach(message => {
+                let event = 'message';
+                let data = '';
+                message.split('\n').forEach(line => {
+                    if (line.startsWith('event:')) {
+                        event = line.slice(6).trim();
+                    } else if (line.startsWith('data:')) {
+                        data += line.slice(5).trim();
+                    }
+                });
+                if (data) {
+                    handleEvent(event, JSON.parse(data));
+                }
+            });
+            if (!done) {
+                return pump();
+            }
+            document.getElementById('predictionLoading').style.display = 'none';
+        });
+    }
+
+    return pump();
+}
+
 // 显示预测结果
 function displayPredictionResults(result) {
+    drawPredictionChart(result);
+
+    // 显示预测统计信息
+    displayPredictionStats(result);
+    document.getElementById('predictionResults').style.display = 'block';
+}
+
+// 绘制预测图表，流式预测时 result.prediction 会随数据块到达而增长
+function drawPredictionChart(result) {
     const ctx = document.getElementById('predictionChart').getContext('2d');
     
     if (predictionChart) {
@@ -510,10 +618,6 @@ function displayPredictionResults(result) {
             }
         }
     });
-
-    // 显示预测统计信息
-    displayPredictionStats(result);
-    document.getElementById('predictionResults').style.display = 'block';
 }
 
 // 显示预测统计信息
@@ -537,7 +641,7 @@ function displayPredictionStats(result) {
         <p><strong>模型：</strong>Predenergy</p>
         <p><strong>预测方法：</strong>零样本生成</p>
         <p><strong>输入长度：</strong>${result.history.length}</p>
-        <p><strong>生成样本数：</strong>20</p>
+        <p><strong>生成样本数：</strong>${result.num_samples || 20}</p>
     `;
 }
 
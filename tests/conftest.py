@@ -0,0 +1,45 @@
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# 配置在导入时读取环境变量，须在导入 app 之前设置：内存数据库、临时示例数据集目录，不启动后台作业
+DATASET_DIR = tempfile.mkdtemp(prefix='dataset-')
+os.environ['TEST_DATABASE_URL'] = 'sqlite://'
+os.environ['INFERENCE_DATASET_DIR'] = DATASET_DIR
+os.environ['JOB_DISPATCH_ENABLED'] = 'false'
+os.environ['STATUS_SYNC_ENABLED'] = 'false'
+
+from app import create_app  # noqa: E402
+from app.api import inference  # noqa: E402
+
+
+class StubModel:
+    """以最后一个观测值作为全部预测采样的桩模型"""
+
+    def generate(self, x, max_new_tokens, num_samples=20, **kwargs):
+        return x[:, -1:].unsqueeze(1).repeat(1, num_samples, max_new_tokens)
+
+
+def _write_sample_dataset(rows=2000):
+    steps = np.arange(rows)
+    pd.DataFrame({
+        'date': pd.date_range('2020-01-01', periods=rows, freq='h').strftime('%Y-%m-%d %H:%M:%S'),
+        'HUFL': np.sin(steps / 24.0),
+        'OT': 20.0 + steps % 97 / 10.0
+    }).to_csv(os.path.join(DATASET_DIR, 'ETTh1.csv'), index=False)
+
+
+@pytest.fixture(scope='session')
+def app():
+    _write_sample_dataset()
+    inference.model_manager._loader = StubModel
+    inference.model_manager._warmup = None
+    return create_app('testing')
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,75 @@
+import io
+import threading
+from urllib.parse import unquote
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+from wsgiref.validate import validator
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+import requests
+
+from app.services import array_codec
+from conftest import DATASET_DIR
+
+
+@pytest.fixture(scope='module')
+def server(app):
+    """在标准库的参考 WSGI 服务器上运行应用，validator 校验响应体符合 WSGI 规范（必须为 bytes）"""
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args):
+            pass
+
+    httpd = make_server('127.0.0.1', 0, validator(app), handler_class=QuietHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_port}'
+    httpd.shutdown()
+    thread.join()
+
+
+def _expected():
+    return pd.read_csv(f'{DATASET_DIR}/ETTh1.csv')
+
+
+def test_npy_round_trip(server):
+    response = requests.get(
+        f'{server}/api/inference/sample-data/ETTh1',
+        params={'columns': 'HUFL,OT', 'offset': 10, 'limit': 50},
+        headers={'Accept': array_codec.NPY}
+    )
+    assert response.status_code == 200
+    assert response.headers['Content-Type'] == array_codec.NPY
+    assert int(response.headers['Content-Length']) == len(response.content)
+
+    array = np.load(io.BytesIO(response.content))
+    expected = _expected()[['HUFL', 'OT']].to_numpy(np.float32)[10:60].T
+    assert array.shape == (2, 50)
+    np.testing.assert_array_equal(array, expected)
+    assert unquote(response.headers['X-Columns']) == 'HUFL,OT'
+
+
+def test_arrow_round_trip(server):
+    response = requests.get(
+        f'{server}/api/inference/sample-data/ETTh1',
+        params={'columns': 'OT', 'limit': 100},
+        headers={'Accept': array_codec.ARROW_STREAM}
+    )
+    assert response.status_code == 200
+    assert response.headers['Content-Type'] == array_codec.ARROW_STREAM
+    assert int(response.headers['Content-Length']) == len(response.content)
+
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.column_names == ['OT']
+    np.testing.assert_array_equal(
+        table.column('OT').to_numpy(), _expected()['OT'].to_numpy(np.float32)[:100]
+    )
+    assert table.schema.metadata[b'total_rows'] == b'2000'
+
+
+def test_json_remains_default(server):
+    response = requests.get(f'{server}/api/inference/sample-data/ETTh1', params={'columns': 'OT', 'limit': 3})
+    assert response.headers['Content-Type'] == 'application/json'
+    assert response.json()['columns']['OT'] == pytest.approx(_expected()['OT'][:3].tolist())
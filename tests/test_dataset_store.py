@@ -0,0 +1,43 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from app.services.dataset_store import DatasetStore
+
+
+def _write(path, values):
+    pd.DataFrame({'OT': values}).to_csv(path, index=False)
+
+
+def test_persisted_cache_is_memory_mapped(tmp_path):
+    _write(tmp_path / 'a.csv', np.arange(10.0))
+    DatasetStore(str(tmp_path), {'a': 'a.csv'}).get('a')
+
+    store = DatasetStore(str(tmp_path), {'a': 'a.csv'})
+    dataset = store.get('a')
+    assert isinstance(dataset.columns['OT'], np.memmap)
+    assert store.stats()['disk_loads'] == 1
+    np.testing.assert_array_equal(dataset.columns['OT'], np.arange(10.0))
+
+
+def test_rewrite_does_not_touch_mapped_files(tmp_path):
+    _write(tmp_path / 'a.csv', np.arange(10.0))
+    DatasetStore(str(tmp_path), {'a': 'a.csv'}).get('a')
+    reader = DatasetStore(str(tmp_path), {'a': 'a.csv'}).get('a')
+
+    # 源文件变更后由另一个进程重新解析并写缓存，已映射旧文件的读者数据保持不变
+    _write(tmp_path / 'a.csv', np.arange(100.0, 120.0))
+    stat = os.stat(tmp_path / 'a.csv')
+    os.utime(tmp_path / 'a.csv', ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    writer = DatasetStore(str(tmp_path), {'a': 'a.csv'})
+    np.testing.assert_array_equal(writer.get('a').columns['OT'], np.arange(100.0, 120.0))
+
+    np.testing.assert_array_equal(reader.columns['OT'], np.arange(10.0))
+    versions = os.listdir(tmp_path / DatasetStore.CACHE_DIR / 'a')
+    assert len(versions) == 1
+    assert not [name for name in os.listdir(tmp_path / DatasetStore.CACHE_DIR / 'a' / versions[0])
+                if name.startswith('.tmp-')]
+    np.testing.assert_array_equal(
+        DatasetStore(str(tmp_path), {'a': 'a.csv'}).get('a').columns['OT'], np.arange(100.0, 120.0)
+    )
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.api import fleet
+from app.models import Device, FleetForecastRun, PredictionResult, PredictionTask, RealtimeData, User
+
+
+@pytest.fixture
+def devices(app, monkeypatch):
+    tables = [model.__table__ for model in (User, Device, RealtimeData, PredictionTask, PredictionResult, FleetForecastRun)]
+    monkeypatch.setitem(app.config, 'INFERENCE_FLEET_BATCH_SIZE', 1)
+    monkeypatch.setitem(app.config, 'INFERENCE_FLEET_MIN_HISTORY', 8)
+    monkeypatch.setitem(app.config, 'INFERENCE_FLEET_HORIZON', 4)
+    monkeypatch.setitem(app.config, 'INFERENCE_FLEET_NUM_SAMPLES', 2)
+    with app.app_context():
+        db.metadata.create_all(db.engine, tables=tables)
+        start = datetime(2026, 1, 1)
+        for device_id in (1, 2, 3):
+            db.session.add(Device(device_id=device_id, device_type='wind'))
+            db.session.add_all(
+                RealtimeData(device_id=device_id, timestamp=start + timedelta(hours=step), power_output=float(step))
+                for step in range(16)
+            )
+        db.session.commit()
+        yield
+        db.session.rollback()
+        db.metadata.drop_all(db.engine, tables=tables)
+
+
+def _task_statuses():
+    return dict(db.session.execute(db.select(PredictionTask.target, PredictionTask.status)).all())
+
+
+def test_fleet_forecast_completes_all_tasks(app, devices):
+    with app.app_context():
+        stats = fleet.run_fleet_forecast()
+
+        assert stats['devices'] == 3 and stats['batches'] == 3
+        assert _task_statuses() == {'1': 'completed', '2': 'completed', '3': 'completed'}
+        assert {task.parameters['progress'] for task in db.session.scalars(db.select(PredictionTask))} == {100}
+        assert db.session.scalar(db.select(db.func.count()).select_from(PredictionResult)) == 12
+
+
+def test_fleet_forecast_failure_marks_unfinished_tasks_failed(app, devices, monkeypatch):
+    timestamps = fleet._forecast_timestamps
+    calls = []
+
+    def failing_timestamps(*args):
+        calls.append(args)
+        if len(calls) == 2:
+            raise RuntimeError('写入失败')
+        return timestamps(*args)
+
+    monkeypatch.setattr(fleet, '_forecast_timestamps', failing_timestamps)
+    with app.app_context():
+        with pytest.raises(RuntimeError):
+            fleet.run_fleet_forecast()
+
+        assert _task_statuses() == {'1': 'completed', '2': 'failed', '3': 'failed'}
+        failed = db.session.scalars(db.select(PredictionTask).where(PredictionTask.status == 'failed')).all()
+        assert all(task.parameters['error'] == '写入失败' for task in failed)
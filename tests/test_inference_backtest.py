@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import DATASET_DIR
+
+
+def _backtest(client, **body):
+    response = client.post('/api/inference/backtest', json={
+        'column': 'OT', 'lookback': 32, 'horizon': 8, 'windows': 3, 'num_samples': 2,
+        'return_predictions': True, **body
+    })
+    result = response.get_json()
+    assert result['success'], result['message']
+    return result['result']
+
+
+def test_dataset_start_is_applied_once(client):
+    values = pd.read_csv(f'{DATASET_DIR}/ETTh1.csv')['OT'].tolist()
+    result = _backtest(client, dataset='ETTh1', start=100)
+
+    assert [window['start'] for window in result['windows']] == [100, 108, 116]
+    # 桩模型以窗口最后一个观测值作为预测，第一个窗口的历史应截止于 start + lookback
+    assert result['predictions'][0] == pytest.approx([values[100 + 32 - 1]] * 8)
+
+
+def test_dataset_start_matches_uploaded_data(client):
+    values = pd.read_csv(f'{DATASET_DIR}/ETTh1.csv')['OT'].tolist()
+    from_dataset = _backtest(client, dataset='ETTh1', start=100)
+    uploaded = _backtest(client, data={'OT': values}, start=100)
+
+    assert [window['start'] for window in from_dataset['windows']] == [window['start'] for window in uploaded['windows']]
+    assert [window['mae'] for window in from_dataset['windows']] == pytest.approx(
+        [window['mae'] for window in uploaded['windows']]
+    )
+    np.testing.assert_allclose(from_dataset['predictions'], uploaded['predictions'], rtol=1e-6)
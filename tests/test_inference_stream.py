@@ -0,0 +1,74 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.api import inference
+from app.services.singleflight import SingleFlight
+
+
+def _events(response):
+    """解析 SSE 响应为 [(event, data)]"""
+    events = []
+    for message in response.get_data(as_text=True).split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in message.splitlines() if ': ' in line)
+        if 'event' in lines:
+            events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+def _stream(client, **body):
+    return client.post('/api/inference/predict/stream', json={
+        'dataset': 'ETTh1', 'target_variable': 'OT', 'start_position': 200, 'forecast_length': 20,
+        'num_samples': 2, **body
+    })
+
+
+@pytest.mark.parametrize('chunk_size', [0, -4, 'abc'])
+def test_invalid_chunk_size_is_rejected(client, chunk_size):
+    result = _stream(client, chunk_size=chunk_size).get_json()
+
+    assert result == {'success': False, 'message': 'chunk_size 必须为正整数'}
+
+
+@pytest.mark.parametrize('chunk_size, chunks', [(8, 3), (1000, 1)])
+def test_done_is_built_from_received_chunks(client, chunk_size, chunks):
+    # 第二次请求命中缓存，按块切分已有结果
+    for _ in range(2):
+        events = _events(_stream(client, chunk_size=chunk_size, quantiles=[0.1, 0.9]))
+
+        assert [name for name, _ in events] == ['meta'] + ['chunk'] * chunks + ['done']
+        streamed = np.concatenate([data['prediction'] for name, data in events if name == 'chunk'])
+        done = events[-1][1]
+        np.testing.assert_allclose(done['prediction'], streamed)
+        assert np.asarray(done['quantiles']).shape == (2, 20)
+
+
+def test_chunked_stream_does_not_fill_predict_cache(client):
+    cache = inference.get_forecast_cache()
+    _events(_stream(client, start_position=500, chunk_size=8))
+
+    hits = cache.stats()['hits']
+    result = client.post('/api/inference/predict', json={
+        'dataset': 'ETTh1', 'target_variable': 'OT', 'start_position': 500, 'forecast_length': 20, 'num_samples': 2
+    }).get_json()
+    assert result['success'], result['message']
+    assert cache.stats()['hits'] == hits
+
+    # 一次完整解码的结果可直接按块切分给流式请求
+    events = _events(_stream(client, start_position=500, chunk_size=5))
+    assert cache.stats()['hits'] == hits + 1
+    assert [name for name, _ in events].count('chunk') == 4
+
+
+def test_resolve_with_finished_future_keeps_new_leader():
+    flight = SingleFlight()
+    first, _ = flight.claim('key')
+    flight.resolve('key', 1, future=first)
+    second, is_leader = flight.claim('key')
+
+    flight.resolve('key', error=RuntimeError('流式预测已中断'), future=first)
+
+    assert is_leader and not second.done()
+    flight.resolve('key', 2, future=second)
+    assert second.result() == 2
@@ -0,0 +1,102 @@
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import db
+from app.api import model as model_api
+from app.api.dispatch import JOB_KINDS, dispatch_pending_jobs, dispatcher_health
+from app.api.status_sync import sync_job_status
+from app.models import JobHeartbeat, ModelTraining, User
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, payload=None):
+        self.status_code = status_code
+        self._payload = payload or {}
+        self.text = str(self._payload)
+
+    def json(self):
+        return self._payload
+
+
+class FakeModelService:
+    """记录调用路径的模型服务客户端，状态查询返回 remote_status"""
+
+    max_concurrency = 4
+
+    def __init__(self, remote_status):
+        self.remote_status = remote_status
+        self.calls = []
+
+    def post(self, operation, path, **kwargs):
+        self.calls.append(path)
+        if path == '/train/status/batch':
+            return FakeResponse(payload={'items': [
+                {'trainingId': job_id, 'status': self.remote_status, 'progress': 0.0}
+                for job_id in kwargs['json']['trainingIds']
+            ]})
+        return FakeResponse()
+
+    def get(self, operation, path, **kwargs):
+        self.calls.append(path)
+        return FakeResponse(payload={'status': self.remote_status})
+
+
+@pytest.fixture
+def training(app):
+    # 只建分发与同步用到的表（完整模型中有引用不存在表的外键，无法 create_all）
+    tables = [User.__table__, JobHeartbeat.__table__] + [spec['model'].__table__ for spec in JOB_KINDS.values()]
+    with app.app_context():
+        db.metadata.create_all(db.engine, tables=tables)
+        row = ModelTraining(model_type='Predenergy', dataset_config={}, training_params={})
+        db.session.add(row)
+        db.session.commit()
+        yield row.training_id
+        db.session.rollback()
+        db.metadata.drop_all(db.engine, tables=tables)
+
+
+@pytest.mark.parametrize('remote_status, expected', [
+    ('pending', 'running'),
+    ('queued', 'running'),
+    ('running', 'running'),
+    ('completed', 'completed'),
+    ('failed', 'failed')
+])
+def test_sync_never_returns_submitted_job_to_dispatch(app, training, monkeypatch, remote_status, expected):
+    client = FakeModelService(remote_status)
+    monkeypatch.setattr(model_api, '_model_service', client)
+    # 同步只处理超过半个间隔未刷新的记录，测试中立即同步
+    monkeypatch.setitem(app.config, 'STATUS_SYNC_INTERVAL_SECONDS', 0)
+
+    with app.app_context():
+        assert dispatch_pending_jobs()['submitted'] == 1
+        assert db.session.get(ModelTraining, training).status == 'running'
+
+        assert sync_job_status()['updated'] == 1
+        db.session.expire_all()
+        assert db.session.get(ModelTraining, training).status == expected
+
+        assert dispatch_pending_jobs()['claimed'] == 0
+
+    assert client.calls == ['/train', '/train/status/batch']
+
+
+def test_submit_warns_until_a_dispatcher_has_run(app, client, training, monkeypatch):
+    monkeypatch.setitem(app.config, 'JOB_DISPATCH_ENABLED', True)
+    monkeypatch.setattr(model_api, '_model_service', FakeModelService('running'))
+    with app.app_context():
+        headers = {'Authorization': f'Bearer {create_access_token(identity="1")}'}
+    body = {'modelType': 'Predenergy', 'datasetConfig': {}, 'trainingParams': {}}
+
+    # 本进程未运行调度器，且没有其他进程的分发心跳
+    result = client.post('/api/model/train', headers=headers, json=body).get_json()
+    assert result['code'] == 200 and '没有任务分发进程运行' in result['warning']
+    status = client.get('/api/model/jobs/status', headers=headers).get_json()['data']['dispatcher']
+    assert status['active'] is False and status['lastRunAt'] is None
+
+    with app.app_context():
+        dispatch_pending_jobs()
+        assert dispatcher_health()['active'] is True
+
+    result = client.post('/api/model/train', headers=headers, json=body).get_json()
+    assert result['code'] == 200 and 'warning' not in result
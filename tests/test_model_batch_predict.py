@@ -0,0 +1,47 @@
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app.api import model as model_api
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, size):
+        self.size = size
+
+    def json(self):
+        return {'predictions': [[0.0]] * self.size, 'metadata': {'model': 'Predenergy'}}
+
+
+class FakeModelService:
+    max_concurrency = 4
+
+    def post(self, operation, path, json=None, **kwargs):
+        return FakeResponse(len(json['inputDataList']))
+
+
+@pytest.fixture
+def headers(app, monkeypatch):
+    monkeypatch.setattr(model_api, '_model_service', FakeModelService())
+    with app.app_context():
+        return {'Authorization': f'Bearer {create_access_token(identity="1")}'}
+
+
+@pytest.mark.parametrize('chunk_size, chunks', [(None, 1), (2, 2)])
+def test_metadata_stays_service_object(client, headers, chunk_size, chunks):
+    result = client.post('/api/model/batch-predict', headers=headers, json={
+        'inputDataList': [[1.0], [2.0], [3.0]], 'chunkSize': chunk_size
+    }).get_json()
+
+    assert result['code'] == 200
+    assert result['data']['metadata'] == {'model': 'Predenergy'}
+    assert [item['range'] for item in result['data']['chunkMetadata']] == ([[0, 3]] if chunks == 1 else [[0, 2], [2, 3]])
+    assert len(result['data']['predictions']) == 3
+
+
+def test_missing_body_returns_error_response(client, headers):
+    response = client.post('/api/model/batch-predict', headers=headers)
+
+    assert response.status_code == 500
+    assert response.get_json()['code'] == 500
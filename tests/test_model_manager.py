@@ -0,0 +1,45 @@
+from app.services.model_manager import ModelManager
+
+
+class FlakyLoader:
+    """前 failures 次加载抛出异常，之后返回模型"""
+
+    def __init__(self, failures=1):
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError('检查点暂不可用')
+        return object()
+
+
+def test_failed_load_is_retried_after_interval(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('app.services.model_manager.time.time', lambda: now[0])
+    loader = FlakyLoader()
+    manager = ModelManager(loader, retry_after=30)
+
+    assert manager.get_model() is None
+    assert manager.state == ModelManager.FAILED
+
+    # 间隔内直接失败，不重复加载
+    now[0] += 10
+    assert manager.get_model() is None
+    assert loader.calls == 1
+
+    now[0] += 20
+    assert manager.get_model() is not None
+    assert manager.state == ModelManager.READY
+    assert manager.failed_at is None
+    assert loader.calls == 2
+
+
+def test_failed_load_is_not_retried_without_interval():
+    loader = FlakyLoader()
+    manager = ModelManager(loader, retry_after=None)
+
+    assert manager.get_model() is None
+    assert manager.get_model() is None
+    assert loader.calls == 1
@@ -0,0 +1,30 @@
+from app.services.forecast_cache import ForecastCache
+from app.services.model_registry import ModelRegistry
+
+
+class Checkpoint:
+    def __init__(self, path):
+        self.path = path
+
+
+def test_checkpoint_change_gets_new_cache_identity():
+    cache = ForecastCache(max_entries=16, ttl_seconds=60, max_bytes=1024 * 1024)
+    registry = ModelRegistry(Checkpoint, on_evict=lambda manager: cache.invalidate_model(manager.name))
+    history = [1.0, 2.0, 3.0]
+
+    old = registry.acquire(1, '/models/a')
+    new = registry.acquire(1, '/models/b')
+    assert new is not old and new.model.path == '/models/b'
+
+    # 仍持有旧管理器的请求在检查点变更后写入结果，不能被新检查点的请求命中
+    old_key = ForecastCache.make_key(history, old.name, old.generation, forecast_length=4)
+    cache.put(old_key, [[0.0] * 4], model_name=old.name)
+    new_key = ForecastCache.make_key(history, new.name, new.generation, forecast_length=4)
+    cache.bind_model(new.name, new.generation)
+
+    assert new.generation > old.generation
+    assert new_key != old_key
+    assert cache.get(new_key) is None
+
+    registry.release(old)
+    registry.release(new)
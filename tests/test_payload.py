@@ -0,0 +1,42 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+from app.services import payload
+
+pytestmark = pytest.mark.skipif(not payload.streaming_available(), reason='未安装 ijson')
+
+ROWS = [{'date': f'2020-01-01 0{hour}:00', 'HUFL': hour * 0.5, 'OT': 20.0 + hour} for hour in range(5)]
+COLUMNS = {'date': [row['date'] for row in ROWS], 'HUFL': [row['HUFL'] for row in ROWS],
+           'OT': [row['OT'] for row in ROWS]}
+
+
+def _parse(body, **kwargs):
+    return payload.parse_json_payload(io.BytesIO(json.dumps(body).encode()), **kwargs)
+
+
+@pytest.mark.parametrize('data', [ROWS, COLUMNS], ids=['rows', 'columns'])
+def test_target_before_data_keeps_only_target(data):
+    params = _parse({'target_variable': 'OT', 'forecast_length': 4, 'data': data})
+    assert list(params['data']) == ['OT']
+    np.testing.assert_array_equal(params['data']['OT'], np.arange(20.0, 25.0, dtype=np.float32))
+    assert params['forecast_length'] == 4
+
+
+@pytest.mark.parametrize('data', [ROWS, COLUMNS], ids=['rows', 'columns'])
+def test_target_after_data_keeps_only_target(data):
+    params = _parse({'data': data, 'targets': ['OT', 'HUFL'], 'forecast_length': 4})
+    assert sorted(params['data']) == ['HUFL', 'OT']
+    np.testing.assert_array_equal(params['data']['OT'], np.arange(20.0, 25.0, dtype=np.float32))
+
+
+def test_all_targets_keep_every_column():
+    params = _parse({'data': ROWS, 'targets': 'all'})
+    assert sorted(params['data']) == ['HUFL', 'OT', 'date']
+
+
+def test_explicit_keep_wins():
+    params = _parse({'data': ROWS, 'target_variable': 'OT'}, keep=['HUFL'])
+    assert list(params['data']) == ['HUFL']